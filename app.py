@@ -1,8 +1,10 @@
+import io
 import streamlit as st
-import pandas as pd
-import numpy as np
-import pickle
-import re
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from mediguide import audit, bulk, core, executor, registry, uiprofile
+from mediguide.questionnaire import Questionnaire
+from mediguide.session_store import ResultStore, SessionResult
+from mediguide.vocabulary import symptom_names, symptoms_dict
 # ---------------------- Page Config ----------------------
 st.set_page_config(
     page_title="MediGuide Pro",
@@ -11,12 +13,34 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Read the model and tables in the background; the symptom picker needs neither
+core.start_loading()
+
 
 # ---------------------- Session State Management ----------------------
-if 'predict' not in st.session_state:
-    st.session_state.predict = False
 if 'symptoms' not in st.session_state:
     st.session_state.symptoms = []
+if 'questionnaire' not in st.session_state:
+    st.session_state.questionnaire = None
+
+@st.cache_resource
+def result_store():
+    """Prediction results of all sessions, bounded server-wide"""
+    return ResultStore(max_sessions=10_000, ttl=3600)
+
+@st.cache_resource
+def prediction_executor():
+    """Optional worker pool, enabled with MEDIGUIDE_EXECUTOR=thread|process"""
+    return executor.from_env()
+
+@st.cache_resource
+def model_registry():
+    """Optional versioned bundles with tenant/experiment routing, enabled with MEDIGUIDE_REGISTRY"""
+    return registry.from_env()
+
+def session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
 
 # ---------------------- Theme-Compatible CSS ----------------------
 st.markdown("""
@@ -69,254 +93,181 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# ---------------------- Data Loading ----------------------
-@st.cache_data
-def load_data():
-    with open("svc.pkl", "rb") as file:
-        model = pickle.load(file)
-    
-    return (
-        model,
-        pd.read_csv("description.csv"),
-        pd.read_csv("precautions_df.csv"),
-        pd.read_csv("medications.csv"),
-        pd.read_csv("diets.csv"),
-        pd.read_csv("workout_df.csv")
+# ---------------------- Prediction & Report Cache ----------------------
+def submit_symptoms(symptoms, predicted_index=None):
+    """Predict once and keep the compact result for this session"""
+    key = core.encode_key(symptoms)
+    versions = model_registry()
+    if versions is not None:
+        name = versions.route(st.query_params.get("tenant"), st.query_params.get("experiment"), session_id())
+        version = versions.version(name)
+        # The routed version scores every session, questionnaire intakes included, so arms stay comparable
+        predicted_index = version.recommend_key(key).disease_id
+        log = core.get_audit_log()
+        if log is not None:
+            log.record(key, predicted_index, audit.version_label(name, version.model_hash))
+        result_store().put(
+            session_id(),
+            SessionResult(key, predicted_index, version=name)
+        )
+        return
+
+    source = None
+    if predicted_index is None:
+        pool = prediction_executor()
+        if pool is not None:
+            predicted_index = pool.submit_key(key).result().disease_id
+        else:
+            predicted_index = core.predict_key(key)
+    else:
+        # Decided by the questionnaire's posterior, no model ran
+        source = audit.QUESTIONNAIRE_SOURCE
+    log = core.get_audit_log()
+    if log is not None:
+        log.record(key, predicted_index, source)
+    result_store().put(
+        session_id(),
+        SessionResult(key, predicted_index)
     )
 
-model, disease_description, precautions, medications, diet, workout_df = load_data()
+@st.cache_data(max_entries=256)
+def render_report(disease_id, version=None):
+    """Build the report HTML once per disease and model version"""
+    if version is not None:
+        report = model_registry().version(version).report(disease_id)
+    else:
+        report = core.get_report(disease_id)
 
-# ---------------------- Data Processing Functions ----------------------
-def clean_recommendation(item):
-    """Clean and format recommendation items"""
-    # Remove special characters and extra spaces
-    item = re.sub(r"[\[\]'\"\\]", "", str(item))
-    # Remove leading/trailing commas and whitespace
-    item = re.sub(r"^,+|,+$", "", item).strip()
-    # Remove extra commas between items
-    return re.sub(r",{2,}", ",", item)
+    def section_items(items):
+        return items or ["No recommendations available"]
 
-def process_recommendations(df, disease):
-    """Process recommendations with proper cleaning and splitting"""
-    try:
-        items = df[df["Disease"] == disease].iloc[:, 1:] \
-                  .dropna(axis=1) \
-                  .values.flatten() \
-                  .tolist()
-        
-        processed = []
-        for item in items:
-            # Clean and split comma-separated values
-            cleaned = clean_recommendation(item)
-            if cleaned:
-                processed.extend([i.strip() for i in cleaned.split(",") if i.strip()])
-        
-        return processed if processed else ["No recommendations available"]
-    except Exception as e:
-        return ["Recommendations not available"]
-
-
-# ---------------------- Dictionaries ----------------------
-diseases_list = {
-    15:'Fungal infection',
-    4: 'Allergy',
-    16: 'GERD',
-    9: 'Chronic cholesterol',
-    14: 'Drug Reaction',
-    33: 'Peptic ulcer disease',
-    1: 'AIDS',
-    12: 'Diabetes',
-    17: 'Gastroenteritis',
-    6: 'Bronchial Asthma',
-    23: 'Hypertension',
-    30: 'Migraine',
-    7: 'Cervical spondylosis',
-    32: 'Paralysis (brain hemorrhage)',
-    28: 'Jaundice',
-    29: 'Malaria',
-    8: 'Chicken pox',
-    11: 'Dengue',
-    37: 'Typhoid',
-    40: 'Hepatitis A',
-    19: 'Hepatitis B',
-    20: 'Hepatitis C',
-    21: 'Hepatitis D',
-    22: 'Hepatitis E',
-    3: 'Alcoholic hepatitis',
-    36: 'Tuberculosis',
-    10: 'Common Cold',
-    34: 'Pneumonia',
-    13: 'Dimorphic hemorrhoids (piles)',
-    18: 'Heart attack',
-    39: 'Varicose veins',
-    26: 'Hypothyroidism',
-    24: 'Hyperthyroidism',
-    25: 'Hypoglycemia',
-    31: 'Osteoarthritis',
-    5: 'Arthritis',
-    0: '(vertigo) Paroxysmal Positional Vertigo',
-    2: 'Acne',
-    38: 'Urinary tract infection',
-    35: 'Psoriasis',
-    27: 'Impetigo'
-}
-
-symptoms_dict = {
-     'itching': 0,
-    'skin_rash': 1,
-    'nodal_skin_eruptions': 2,
-    'continuous_sneezing': 3,
-    'shivering': 4,
-    'chills': 5,
-    'joint_pain': 6,
-    'stomach_pain': 7,
-    'acidity': 8,
-    'ulcers_on_tongue': 9,
-    'muscle_wasting': 10,
-    'vomiting': 11,
-    'burning_micturition': 12,
-    'spotting_urination': 13,
-    'fatigue': 14,
-    'weight_gain': 15,
-    'anxiety': 16,
-    'cold_hands_and_feets': 17,
-    'mood_swings': 18,
-    'weight_loss': 19,
-    'restlessness': 20,
-    'lethargy': 21,
-    'patches_in_throat': 22,
-    'irregular_sugar_level': 23,
-    'cough': 24,
-    'high_fever': 25,
-    'sunken_eyes': 26,
-    'breathlessness': 27,
-    'sweating': 28,
-    'dehydration': 29,
-    'indigestion': 30,
-    'headache': 31,
-    'yellowish_skin': 32,
-    'dark_urine': 33,
-    'nausea': 34,
-    'loss_of_appetite': 35,
-    'pain_behind_the_eyes': 36,
-    'back_pain': 37,
-    'constipation': 38,
-    'abdominal_pain': 39,
-    'diarrhoea': 40,
-    'mild_fever': 41,
-    'yellow_urine': 42,
-    'yellowing_of_eyes': 43,
-    'acute_liver_failure': 44,
-    'fluid_overload': 45,
-    'swelling_of_stomach': 46,
-    'swelled_lymph_nodes': 47,
-    'malaise': 48,
-    'blurred_and_distorted_vision': 49,
-    'phlegm': 50,
-    'throat_irritation': 51,
-    'redness_of_eyes': 52,
-    'sinus_pressure': 53,
-    'runny_nose': 54,
-    'congestion': 55,
-    'chest_pain': 56,
-    'weakness_in_limbs': 57,
-    'fast_heart_rate': 58,
-    'pain_during_bowel_movements': 59,
-    'pain_in_anal_region': 60,
-    'bloody_stool': 61,
-    'irritation_in_anus': 62,
-    'neck_pain': 63,
-    'dizziness': 64,
-    'cramps': 65,
-    'bruising': 66,
-    'obesity': 67,
-    'swollen_legs': 68,
-    'swollen_blood_vessels': 69,
-    'puffy_face_and_eyes': 70,
-    'enlarged_thyroid': 71,
-    'brittle_nails': 72,
-    'swollen_extremeties': 73,
-    'excessive_hunger': 74,
-    'extra_marital_contacts': 75,
-    'drying_and_tingling_lips': 76,
-    'slurred_speech': 77,
-    'knee_pain': 78,
-    'hip_joint_pain': 79,
-    'muscle_weakness': 80,
-    'stiff_neck': 81,
-    'swelling_joints': 82,
-    'movement_stiffness': 83,
-    'spinning_movements': 84,
-    'loss_of_balance': 85,
-    'unsteadiness': 86,
-    'weakness_of_one_body_side': 87,
-    'loss_of_smell': 88,
-    'bladder_discomfort': 89,
-    'foul_smell_of_urine': 90,
-    'continuous_feel_of_urine': 91,
-    'passage_of_gases': 92,
-    'internal_itching': 93,
-    'toxic_look_(typhos)': 94,
-    'depression': 95,
-    'irritability': 96,
-    'muscle_pain': 97,
-    'altered_sensorium': 98,
-    'red_spots_over_body': 99,
-    'belly_pain': 100,
-    'abnormal_menstruation': 101,
-    'dischromic_patches': 102,
-    'watering_from_eyes': 103,
-    'increased_appetite': 104,
-    'polyuria': 105,
-    'family_history': 106,
-    'mucoid_sputum': 107,
-    'rusty_sputum': 108,
-    'lack_of_concentration': 109,
-    'visual_disturbances': 110,
-    'receiving_blood_transfusion': 111,
-    'receiving_unsterile_injections': 112,
-    'coma': 113,
-    'stomach_bleeding': 114,
-    'distention_of_abdomen': 115,
-    'history_of_alcohol_consumption': 116,
-    'fluid_overload.1': 117,
-    'blood_in_sputum': 118,
-    'prominent_veins_on_calf': 119,
-    'palpitations': 120,
-    'painful_walking': 121,
-    'pus_filled_pimples': 122,
-    'blackheads': 123,
-    'scurring': 124,
-    'skin_peeling': 125,
-    'silver_like_dusting': 126,
-    'small_dents_in_nails': 127,
-    'inflammatory_nails': 128,
-    'blister': 129,
-    'red_sore_around_nose': 130,
-    'yellow_crust_ooze': 131
-    
-}
+    header = f"""
+        <div class="report-card">
+            <div style="display: flex; align-items: center; gap: 20px; margin-bottom: 25px;">
+                <div style="font-size: 2.5em; color: var(--primary-color);">🩺</div>
+                <div>
+                    <h2 style="margin: 0; color: var(--primary-color);">{report.disease}</h2>
+                    <p style="margin: 10px 0 0 0; color: var(--text-color); line-height: 1.5;">{report.description}</p>
+                </div>
+            </div>
+        </div>
+    """
+
+    recommendations = [
+        ("🛡️ Precautions", section_items(report.precautions), "#FFD700"),
+        ("💊 Medications", section_items(report.medications), "#4CAF50"),
+        ("🥗 Diet Plan", section_items(report.diets), "#FF6B6B"),
+        ("🏋️ Fitness", section_items(report.workouts), "#9C27B0")
+    ]
+
+    cards = []
+    for title, items, color in recommendations:
+        list_items = "".join(
+            [f"<li>{item}</li>" for item in items if item]
+        )
+        cards.append(f"""
+            <div class="report-card">
+                <h3 style="color: {color}; margin-bottom: 15px;">{title}</h3>
+                <ul class="recommendation-list">
+                    {list_items}
+                </ul>
+            </div>
+        """)
+    return header, cards
 
 # ---------------------- Main Interface ----------------------
 st.title("🏥 MediGuide Pro")
 st.markdown("### Your AI-Powered Health Diagnosis Assistant")
 
+# Widgets inside a fragment rerun only that fragment; callbacks that change the
+# result set this flag so the next fragment run escalates to a full rerun
+st.session_state.pop("rerun_app", None)
+
+def rerun_app_if_requested():
+    if st.session_state.pop("rerun_app", False):
+        st.rerun()
+
 # ---------------------- Symptom Selection ----------------------
 def reset_form():
-    st.session_state.predict = False
+    result_store().discard(session_id())
     st.session_state.symptoms = []
+    st.session_state.questionnaire = None
+    st.session_state.rerun_app = True
+
+def answer_question(symptom, value):
+    """Record a questionnaire answer and finish the intake once a disease dominates"""
+    questionnaire = st.session_state.questionnaire
+    questionnaire.answer(symptom, value)
+    if questionnaire.next_question() is None and questionnaire.positive_symptoms:
+        predicted_index, confidence = questionnaire.leading()
+        st.session_state.symptoms = [symptom_names[i] for i in questionnaire.positive_symptoms]
+        # A confident questionnaire already identified the disease, no model call needed
+        submit_symptoms(
+            st.session_state.symptoms,
+            predicted_index if confidence >= questionnaire.confidence else None
+        )
+        st.session_state.rerun_app = True
+
+def add_symptom(symptom):
+    """Add a suggested symptom; the selector is recreated from its default"""
+    st.session_state.symptoms = st.session_state.get("symptom_selector", []) + [symptom]
+    del st.session_state["symptom_selector"]
 
-with st.container():
+intake_mode = st.sidebar.radio(
+    "Intake mode",
+    ["Symptom search", "Guided questionnaire"],
+    key="intake_mode",
+    on_change=reset_form
+)
+
+@st.fragment
+@uiprofile.profiled("picker")
+def symptom_picker():
+    """Intake widgets, selected pills and the analyze button; reruns on its own"""
+    rerun_app_if_requested()
     st.markdown("#### 🔍 Select Your Symptoms")
     
-    selected_symptoms = st.multiselect(
-        "Search or select symptoms:",
-        list(symptoms_dict.keys()),
-        format_func=lambda x: x.replace("_", " ").title(),
-        placeholder="Type or choose symptoms...",
-        key="symptom_selector",
-        default=st.session_state.symptoms
-    )
+    if intake_mode == "Guided questionnaire":
+        if st.session_state.questionnaire is None:
+            st.session_state.questionnaire = Questionnaire(core.get_questionnaire_stats())
+        questionnaire = st.session_state.questionnaire
+        selected_symptoms = [symptom_names[i] for i in questionnaire.positive_symptoms]
+        next_symptom = questionnaire.next_question()
+
+        if next_symptom is not None:
+            st.progress(
+                questionnaire.leading()[1],
+                text=f"Question {len(questionnaire.answers) + 1}"
+            )
+            st.markdown(f"**Are you experiencing {symptom_names[next_symptom].replace('_', ' ')}?**")
+            yes_col, no_col, unsure_col = st.columns(3)
+            yes_col.button("Yes", use_container_width=True, on_click=answer_question, args=(next_symptom, True))
+            no_col.button("No", use_container_width=True, on_click=answer_question, args=(next_symptom, False))
+            unsure_col.button("Not sure", use_container_width=True, on_click=answer_question, args=(next_symptom, None))
+        elif not selected_symptoms:
+            st.warning("⚠️ No matching symptoms were reported. Please restart or use symptom search.")
+    else:
+        selected_symptoms = st.multiselect(
+            "Search or select symptoms:",
+            symptom_names,
+            format_func=lambda x: x.replace("_", " ").title(),
+            placeholder="Type or choose symptoms...",
+            key="symptom_selector",
+            default=st.session_state.symptoms
+        )
+        # Suggestions appear once the co-occurrence matrix has arrived, never blocking the picker
+        if selected_symptoms and core.is_ready("cooccurrence"):
+            suggestions = core.get_cooccurrence().suggest([symptoms_dict[s] for s in selected_symptoms], n=4)
+            if suggestions:
+                st.caption("Often reported together:")
+                for col, index in zip(st.columns(4), suggestions):
+                    col.button(
+                        f"+ {symptom_names[index].replace('_', ' ').title()}",
+                        key=f"suggest_{index}",
+                        use_container_width=True,
+                        on_click=add_symptom,
+                        args=(symptom_names[index],)
+                    )
     
     if selected_symptoms:
         st.markdown("**Selected Symptoms:**")
@@ -327,103 +278,110 @@ with st.container():
                 unsafe_allow_html=True
             )
 
-# ---------------------- Prediction ----------------------
-col1, col2 = st.columns([3,1])
-with col1:
-    analyze_btn = st.button("🔬 Analyze Symptoms", use_container_width=True, type="primary")
-with col2:
-    clear_btn = st.button("🧹 Clear Selections", use_container_width=True, on_click=reset_form)
+    # ---------------------- Prediction ----------------------
+    col1, col2 = st.columns([3,1])
+    with col1:
+        analyze_btn = st.button("🔬 Analyze Symptoms", use_container_width=True, type="primary", key="analyze")
+    with col2:
+        st.button("🧹 Clear Selections", use_container_width=True, on_click=reset_form)
+    load_errors = core.load_errors()
+    if load_errors:
+        st.error(f"⚠️ The diagnosis service is unavailable ({', '.join(sorted(load_errors))}). "
+                 "Please contact the site administrator.")
+    elif not core.is_ready():
+        st.caption("⏳ Loading the diagnosis model in the background...")
 
-if clear_btn:
-    st.session_state.symptoms = []
-    st.rerun()
+    if analyze_btn and not load_errors:
+        if len(selected_symptoms) < 1:
+            st.error("⚠️ Please select at least one symptom")
+        else:
+            st.session_state.symptoms = selected_symptoms
+            with st.spinner("🧠 Analyzing symptoms with AI model..."):
+                submit_symptoms(selected_symptoms)
+            # The report lives in its own fragment, show it with a full rerun
+            st.rerun()
 
-if analyze_btn:
-    if len(selected_symptoms) < 1:
-        st.error("⚠️ Please select at least one symptom")
-    else:
-        st.session_state.symptoms = selected_symptoms
-        st.session_state.predict = True
-        st.rerun()
+@st.fragment
+@uiprofile.profiled("report")
+def report_panel():
+    """Report of the session's last result; the markup comes from the ``render_report`` cache"""
+    rerun_app_if_requested()
+    result = result_store().get(session_id())
+    if result is None:
+        return
 
-if st.session_state.predict:
-    with st.spinner("🧠 Analyzing symptoms with AI model..."):
-        # ---------------------- Core Prediction Logic ----------------------
-        input_vector = [0] * 132
-        for symptom in st.session_state.symptoms:
-            index = symptoms_dict[symptom]
-            input_vector[index] = 1
-
-        predicted_index = model.predict([input_vector])[0]
-        predicted_disease = diseases_list.get(predicted_index, "Unknown Disease")
-
-        # ---------------------- Data Processing ----------------------
-        desc_row = disease_description[disease_description["Disease"] == predicted_disease]
-        description = desc_row["Description"].values[0] if not desc_row.empty else "No description available."
-        
-        precaution_list = process_recommendations(precautions, predicted_disease)
-        medication_list = process_recommendations(medications, predicted_disease)
-        diet_list = process_recommendations(diet, predicted_disease)
-        workout_list = process_recommendations(workout_df, predicted_disease)
-
-        # ---------------------- Results Display ----------------------
-        st.success("✅ Analysis Complete! Here's Your Health Report")
-        
-        # Disease Header Card
-        st.markdown(f"""
-            <div class="report-card">
-                <div style="display: flex; align-items: center; gap: 20px; margin-bottom: 25px;">
-                    <div style="font-size: 2.5em; color: var(--primary-color);">🩺</div>
-                    <div>
-                        <h2 style="margin: 0; color: var(--primary-color);">{predicted_disease}</h2>
-                        <p style="margin: 10px 0 0 0; color: var(--text-color); line-height: 1.5;">{description}</p>
-                    </div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
+    header, cards = render_report(result.disease_id, result.version)
 
-        # Recommendations Grid
-        cols = st.columns(4)
-        recommendations = [
-            ("🛡️ Precautions",precaution_list[1:], "#FFD700"),
-            ("💊 Medications", medication_list, "#4CAF50"),
-            ("🥗 Diet Plan", diet_list , "#FF6B6B"),
-            ("🏋️ Fitness", workout_list[1::2], "#9C27B0")
-        ]
-
-        for col, (title, items, color) in zip(cols, recommendations):
-            with col:
-                list_items = "".join(
-                    [f"<li>{item}</li>" for item in items if item]
-                )
-                st.markdown(f"""
-                    <div class="report-card">
-                        <h3 style="color: {color}; margin-bottom: 15px;">{title}</h3>
-                        <ul class="recommendation-list">
-                            {list_items}
-                        </ul>
-                    </div>
-                """, unsafe_allow_html=True)
-
-        # Safety Notice
-        st.markdown("""
-            <div class="report-card emergency-alert">
-                <div style="display: flex; align-items: center; gap: 15px;">
-                    <div style="font-size: 2em; color: #dc3545;">⚠️</div>
-                    <div>
-                        <h3 style="margin: 0; color: #dc3545;">Important Safety Notice</h3>
-                        <p style="margin: 10px 0 0 0; color: var(--text-color);">
-                            This analysis is not a substitute for professional medical advice. 
-                            Always consult a qualified healthcare provider for diagnosis and treatment. 
-                            In emergencies, call your local emergency number immediately.
-                        </p>
-                    </div>
+    # ---------------------- Results Display ----------------------
+    st.success("✅ Analysis Complete! Here's Your Health Report")
+    
+    # Disease Header Card
+    st.markdown(header, unsafe_allow_html=True)
+
+    # Recommendations Grid
+    for col, card in zip(st.columns(4), cards):
+        col.markdown(card, unsafe_allow_html=True)
+
+    # Safety Notice
+    st.markdown("""
+        <div class="report-card emergency-alert">
+            <div style="display: flex; align-items: center; gap: 15px;">
+                <div style="font-size: 2em; color: #dc3545;">⚠️</div>
+                <div>
+                    <h3 style="margin: 0; color: #dc3545;">Important Safety Notice</h3>
+                    <p style="margin: 10px 0 0 0; color: var(--text-color);">
+                        This analysis is not a substitute for professional medical advice. 
+                        Always consult a qualified healthcare provider for diagnosis and treatment. 
+                        In emergencies, call your local emergency number immediately.
+                    </p>
                 </div>
             </div>
-        """, unsafe_allow_html=True)
+        </div>
+    """, unsafe_allow_html=True)
 
-    if st.button("← Start New Diagnosis", type="primary", on_click=reset_form):
-        st.rerun()
+    st.button("← Start New Diagnosis", type="primary", on_click=reset_form)
+
+# ---------------------- Bulk Reports ----------------------
+@st.cache_data(max_entries=8, ttl=3600, show_spinner=False)
+def bulk_archive(roster, version=None):
+    """Zip of the reports of a roster's bytes, kept server-wide for a few recent uploads"""
+    ids, symptom_sets = bulk.read_roster(io.BytesIO(roster))
+    archive = io.BytesIO()
+    # Rendered in-process: forking the server for one upload costs more than it saves
+    results = bulk.generate(ids, symptom_sets, archive, workers=0,
+                            version=model_registry().version(version) if version else None)
+    return archive.getvalue(), results
+
+@st.fragment
+@uiprofile.profiled("bulk")
+def bulk_reports():
+    """Roster upload producing a zip of per-patient reports, built once per roster and model version"""
+    roster = st.file_uploader("Patient roster (CSV)", type="csv", key="bulk_roster")
+    if roster is None:
+        return
+    if core.load_errors():
+        st.error(f"⚠️ The diagnosis service is unavailable ({', '.join(sorted(core.load_errors()))}).")
+        return
+    versions = model_registry()
+    version = None
+    if versions is not None:
+        version = versions.route(st.query_params.get("tenant"), st.query_params.get("experiment"), session_id())
+    try:
+        data, results = bulk_archive(roster.getvalue(), version)
+    except bulk.RosterError as error:
+        st.error(f"⚠️ {error}")
+        return
+    st.caption(f"{results['patients']} reports, {results['patients_per_s']:.0f} patients/s")
+    st.download_button("⬇️ Download reports", data, file_name="reports.zip", mime="application/zip")
 
 # ---------------------- Footer ----------------------
-st.markdown("---")
+@st.fragment
+@uiprofile.profiled("footer")
+def footer():
+    st.markdown("---")
+
+symptom_picker()
+report_panel()
+with st.sidebar.expander("📋 Bulk reports"):
+    bulk_reports()
+footer()
@@ -0,0 +1 @@
+"""Shared building blocks for the MediGuide Streamlit front-ends."""
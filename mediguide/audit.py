@@ -0,0 +1,420 @@
+"""Buffered binary audit log of every prediction.
+
+Each prediction is one fixed-width 32-byte record::
+
+    timestamp   uint64   microseconds since the epoch
+    symptoms    17 bytes bit-packed symptom key (little-endian, 132 bits)
+    version     uint16   id of the model version (names in versions.json)
+    disease     int16    predicted disease id
+    (3 bytes padding)
+
+``AuditLog.record`` only appends a tuple to an in-memory queue; a background
+thread packs the queued records in batches, appends them to the current
+segment file and starts a new segment once it reaches ``max_bytes``. Because
+the records are fixed width, the reader maps whole segments onto a NumPy
+structured dtype instead of parsing them. A failed write (a full disk, a
+corrupt ``versions.json``) puts the batch back and is retried every
+``flush_interval``. While it fails, ``error`` is set and at most
+``max_queued`` records are held, so ``core.load_errors`` reports ``audit`` and
+the front-ends stop serving predictions they cannot record.
+
+Version names are the model file plus its content hash (``svc.pkl@3f2a...``),
+so a retrained model never shares an id with its predecessor; results
+decided by the guided questionnaire without a model are logged as
+``questionnaire``. Several processes may write segments into one directory:
+they intern version names in ``versions.json`` under a file lock.
+
+Usage::
+
+    python -m mediguide.audit read   audit/ [--limit 10]
+    python -m mediguide.audit stats  audit/
+    python -m mediguide.audit replay audit/ [--speed 1.0] [--executor thread]
+
+``read`` streams the log as JSON lines, ``stats`` summarizes it and
+``replay`` re-issues the recorded symptom sets against the current model
+with the recorded inter-arrival gaps (``--speed 0`` replays as fast as
+possible) and reports throughput, latency and changed predictions. It calls
+the model directly; ``--cached`` or ``--executor`` go through the serving
+caches instead. Enable it
+in the front-ends with ``MEDIGUIDE_AUDIT_DIR=audit``.
+"""
+import argparse
+import atexit
+import collections
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: versions.json is only safe with one writer per directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MGAUDIT1"
+KEY_BYTES = 17
+RECORD = struct.Struct("<Q17sHh3x")
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("symptoms", "u1", (KEY_BYTES,)),
+    ("version", "<u2"),
+    ("disease", "<i2"),
+    ("padding", "V3"),
+])
+VERSIONS_FILE = "versions.json"
+QUESTIONNAIRE_SOURCE = "questionnaire"
+SEGMENT_PATTERN = "audit-*.bin"
+
+
+# ---------------------- Writer ----------------------
+class AuditLog:
+    """Asynchronous, buffered writer of fixed-width prediction records with rotation"""
+
+    def __init__(self, directory, max_bytes=64 << 20, flush_interval=1.0, default_version="svc.pkl",
+                 max_queued=100_000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.default_version = default_version
+        # Bounds memory while writes fail; further records are dropped and counted
+        self.max_queued = max_queued
+        os.makedirs(directory, exist_ok=True)
+
+        self._versions = {}
+        self._queue = collections.deque()
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = None
+        self._segment = 0
+        self.written = 0
+        self.segments = 0
+        self.dropped = 0
+        # Last write failure, cleared once a batch is written again; see ``core.load_errors``
+        self.error = None
+
+        self._thread = threading.Thread(target=self._run, name="mediguide-audit", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @contextlib.contextmanager
+    def _versions_lock(self):
+        with open(os.path.join(self.directory, VERSIONS_FILE + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _version_id(self, name):
+        """Id of a version name, interned in versions.json under a lock shared by every writer process"""
+        version_id = self._versions.get(name)
+        if version_id is not None:
+            return version_id
+        path = os.path.join(self.directory, VERSIONS_FILE)
+        with self._versions_lock():
+            # Re-read under the lock: other processes may have added names since
+            known = {name: version_id for version_id, name in version_names(self.directory).items()}
+            if name not in known:
+                known[name] = max(known.values(), default=-1) + 1
+                with open(f"{path}.{os.getpid()}.tmp", "w") as file:
+                    json.dump({str(i): n for n, i in sorted(known.items(), key=lambda item: item[1])}, file, indent=2)
+                os.replace(f"{path}.{os.getpid()}.tmp", path)
+        # Ids are never reassigned, so everything read here can be cached
+        self._versions.update(known)
+        return known[name]
+
+    def record(self, symptom_key, disease_id, version=None, timestamp=None):
+        """Queue one prediction; never blocks on I/O"""
+        if timestamp is None:
+            timestamp = time.time_ns() // 1000
+        if len(self._queue) >= self.max_queued:
+            self.dropped += 1
+            self.error = self.error or BufferError(f"audit queue full, {self.dropped} records dropped")
+            return
+        self._queue.append((timestamp, symptom_key, version or self.default_version, disease_id))
+        if len(self._queue) >= 4096:
+            self._wake.set()
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        while True:
+            self._segment += 1
+            path = os.path.join(self.directory, f"audit-{stamp}-{os.getpid()}-{self._segment:04d}.bin")
+            try:
+                # Another log of this process may have opened the same name within this second
+                # Unbuffered: a failed write leaves nothing behind to be flushed again on close
+                self._file = open(path, "xb", buffering=0)
+                break
+            except FileExistsError:
+                continue
+        try:
+            self._write(MAGIC)
+        except OSError:
+            self._abandon_segment(0)
+            raise
+        self.segments += 1
+
+    def _drain(self):
+        """Write everything queued; on failure the unwritten records go back to the front of the queue"""
+        batch = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return 0
+        done = 0
+        try:
+            buffer = bytearray(RECORD.size * len(batch))
+            for i, (timestamp, key, version, disease_id) in enumerate(batch):
+                RECORD.pack_into(buffer, i * RECORD.size, timestamp, key.to_bytes(KEY_BYTES, "little"),
+                                 self._version_id(version), disease_id)
+            view = memoryview(buffer)
+            while view:
+                if self._file is None or self._file.tell() + RECORD.size > self.max_bytes:
+                    self._open_segment()
+                # Whole records only, so every segment stays a multiple of the record size
+                room = max(1, (self.max_bytes - self._file.tell()) // RECORD.size) * RECORD.size
+                offset = self._file.tell()
+                try:
+                    self._write(view[:room])
+                except OSError:
+                    self._abandon_segment(offset)
+                    raise
+                done += len(view[:room]) // RECORD.size
+                view = view[room:]
+        except BaseException:
+            self._queue.extendleft(reversed(batch[done:]))
+            raise
+        finally:
+            self.written += done
+        return done
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+
+    def _abandon_segment(self, offset):
+        """Cut a partly written chunk off the current segment and start a new one on the retry"""
+        file, self._file = self._file, None
+        try:
+            if offset <= len(MAGIC):
+                # Nothing but (part of) the header: drop the file, the reader rejects segments without one
+                file.close()
+                os.remove(file.name)
+            else:
+                file.truncate(offset)
+                file.close()
+        except OSError:
+            pass
+
+    def _drain_or_report(self):
+        try:
+            if self._drain():
+                self.error = None
+        except Exception as error:  # the writer must outlive a full disk or a corrupt versions.json
+            if self.error is None or repr(self.error) != repr(error):
+                logger.exception("audit log %s: writing %d records failed, retrying", self.directory,
+                                 len(self._queue))
+            self.error = error
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain_or_report()
+        self._drain_or_report()
+        if self._queue:
+            logger.error("audit log %s: %d records could not be written before closing",
+                         self.directory, len(self._queue))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def version_label(name, digest):
+    """Logged version name: a readable name plus the artifact's content hash, so retrains differ"""
+    return f"{name}@{digest[:12]}"
+
+
+def from_env(version=None):
+    """Audit log configured by ``MEDIGUIDE_AUDIT_DIR``, or None"""
+    from mediguide import core
+    from mediguide.evaluate import file_hash
+    from mediguide.loader import read_bytes
+
+    directory = os.environ.get("MEDIGUIDE_AUDIT_DIR")
+    if not directory:
+        return None
+    if version is None:
+        # Hashed like the registry's model_hash, so the same artifact gets the same label
+        path = core.model_path()
+        digest = file_hash(path) if os.path.isdir(path) else hashlib.sha256(read_bytes(path)).hexdigest()
+        version = version_label(os.path.basename(os.path.normpath(path)), digest)
+    return AuditLog(directory, default_version=version)
+
+
+# ---------------------- Reader ----------------------
+def segments(path):
+    """Segment files of a log directory in write order (or a single segment file)"""
+    if os.path.isdir(path):
+        # Names are audit-<date>-<time>-<pid>-<sequence>.bin, so name order is write order per process
+        return sorted(glob.glob(os.path.join(path, SEGMENT_PATTERN)))
+    return [path]
+
+
+def read_records(path, chunk_records=65536):
+    """Stream structured record arrays from every segment under ``path``"""
+    for segment in segments(path):
+        with open(segment, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{segment} is not an audit segment")
+            while True:
+                records = np.fromfile(file, dtype=RECORD_DTYPE, count=chunk_records)
+                if not len(records):
+                    break
+                yield records
+
+
+def version_names(path):
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    try:
+        with open(os.path.join(directory, VERSIONS_FILE)) as file:
+            return {int(version_id): name for version_id, name in json.load(file).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def symptom_keys(records):
+    """Bit-packed symptom keys of a record array as Python ints"""
+    return [int.from_bytes(row.tobytes(), "little") for row in records["symptoms"]]
+
+
+# ---------------------- CLI ----------------------
+def _read(args):
+    from mediguide import core
+    from mediguide.session_store import symptom_indices
+    from mediguide.vocabulary import symptom_names
+
+    names = version_names(args.log)
+    emitted = 0
+    for records in read_records(args.log):
+        for record, key in zip(records, symptom_keys(records)):
+            print(json.dumps({
+                "timestamp": int(record["timestamp"]) / 1e6,
+                "version": names.get(int(record["version"]), int(record["version"])),
+                "disease": core.disease_name(int(record["disease"])),
+                "symptoms": [symptom_names[i] for i in symptom_indices(key)],
+            }))
+            emitted += 1
+            if args.limit and emitted >= args.limit:
+                return 0
+    return 0
+
+
+def _stats(args):
+    from mediguide import core
+
+    names = version_names(args.log)
+    total, first, last = 0, None, None
+    diseases = collections.Counter()
+    versions = collections.Counter()
+    for records in read_records(args.log):
+        total += len(records)
+        first = int(records["timestamp"][0]) if first is None else first
+        last = int(records["timestamp"][-1])
+        diseases.update(records["disease"].tolist())
+        versions.update(records["version"].tolist())
+    print(f"{total} records in {len(segments(args.log))} segments, "
+          f"{(last - first) / 1e6 if total else 0:.1f}s span")
+    for version_id, count in versions.most_common():
+        print(f"  version {names.get(version_id, version_id)}: {count}")
+    for disease_id, count in diseases.most_common(10):
+        print(f"  {core.disease_name(disease_id)}: {count}")
+    return 0
+
+
+def _replay(args):
+    from mediguide import core
+    from mediguide.executor import PredictionExecutor
+
+    pool = PredictionExecutor(args.executor) if args.executor else None
+    model = core.get_model()
+    latencies, changed = [], 0
+    replay_start = previous = None
+    for records in read_records(args.log):
+        for record, key in zip(records, symptom_keys(records)):
+            timestamp = int(record["timestamp"]) / 1e6
+            if args.speed and previous is not None:
+                time.sleep(max(0.0, (timestamp - previous) / args.speed))
+            previous = timestamp
+            replay_start = replay_start or time.perf_counter()
+            start = time.perf_counter()
+            if pool is not None:
+                disease_id = pool.submit_key(key).result().disease_id
+            elif args.cached:
+                disease_id = core.predict_key(key)
+            else:
+                # Recorded traffic repeats itself; the memoized path would only measure cache hits
+                disease_id = int(model.predict(core.decode_key(key))[0])
+            latencies.append(time.perf_counter() - start)
+            changed += disease_id != int(record["disease"])
+    if pool is not None:
+        pool.shutdown()
+    if not latencies:
+        print("empty log")
+        return 0
+    elapsed = time.perf_counter() - replay_start
+    latencies = np.array(latencies) * 1e6
+    print(f"replayed {len(latencies)} requests in {elapsed:.2f}s ({len(latencies) / elapsed:.0f}/s)")
+    print(f"latency p50 {np.percentile(latencies, 50):.1f}us p99 {np.percentile(latencies, 99):.1f}us")
+    print(f"predictions changed vs log: {changed}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read, summarize or replay a MediGuide audit log")
+    commands = parser.add_subparsers(dest="command", required=True)
+    read_parser = commands.add_parser("read")
+    read_parser.add_argument("log")
+    read_parser.add_argument("--limit", type=int, default=0)
+    stats_parser = commands.add_parser("stats")
+    stats_parser.add_argument("log")
+    replay_parser = commands.add_parser("replay")
+    replay_parser.add_argument("log")
+    replay_parser.add_argument("--speed", type=float, default=0.0, help="1.0 = recorded pace, 0 = as fast as possible")
+    replay_parser.add_argument("--executor", choices=("thread", "process"),
+                               help="replay through the serving executor, caches included")
+    replay_parser.add_argument("--cached", action="store_true", help="use the memoized core.predict_key")
+    args = parser.parse_args(argv)
+    return {"read": _read, "stats": _stats, "replay": _replay}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
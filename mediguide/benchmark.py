@@ -0,0 +1,126 @@
+"""Micro-benchmarks of the shared serving hot path.
+
+Usage::
+
+    python -m mediguide.benchmark [--rows 2000] [--repeat 5]
+                                  [--executor thread|process] [--clients 8]
+
+Times cold loading, uncached single predictions, cached predictions, batch
+prediction and report lookup over symptom sets drawn from ``Training.csv``.
+With ``--executor`` it also measures throughput and tail latency of
+``--clients`` concurrent callers going through a ``PredictionExecutor``.
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from mediguide import core
+from mediguide.executor import PredictionExecutor
+from mediguide.vocabulary import symptom_names
+
+
+def training_symptom_sets(rows):
+    training = pd.read_csv(core.resolve_path("Training.csv"))
+    features = training.drop(columns=["prognosis"]).to_numpy()[:rows]
+    return [[symptom_names[i] for i in np.flatnonzero(row)] for row in features]
+
+
+def timed(func, repeat):
+    """Best wall time of ``repeat`` runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows=2000, repeat=5):
+    results = {}
+
+    start = time.perf_counter()
+    core.get_model()
+    core.get_catalog()
+    results["cold_load_ms"] = (time.perf_counter() - start) * 1e3
+
+    symptom_sets = training_symptom_sets(rows)
+    n = len(symptom_sets)
+    model = core.get_model()
+
+    def uncached():
+        for symptoms in symptom_sets:
+            model.predict(core.encode(symptoms))
+
+    def cached():
+        for symptoms in symptom_sets:
+            core.predict(symptoms)
+
+    def batch():
+        core.predict_batch(symptom_sets)
+
+    def reports():
+        for disease_id in core.predict_batch(symptom_sets):
+            core.get_report(int(disease_id))
+
+    cached()  # warm the key cache
+    results["predict_uncached_us"] = timed(uncached, 1) / n * 1e6
+    results["predict_cached_us"] = timed(cached, repeat) / n * 1e6
+    results["predict_batch_us"] = timed(batch, repeat) / n * 1e6
+    results["batch_with_report_us"] = timed(reports, repeat) / n * 1e6
+    return results
+
+
+def run_concurrent(kind, clients, rows=2000):
+    """Drive a ``PredictionExecutor`` from ``clients`` threads, like concurrent sessions"""
+    symptom_sets = training_symptom_sets(rows)
+    latencies = []
+    lock = threading.Lock()
+
+    def client(offset):
+        local = []
+        for symptoms in symptom_sets[offset::clients]:
+            start = time.perf_counter()
+            pool.recommend(symptoms)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    with PredictionExecutor(kind) as pool:
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        stats = pool.stats()
+
+    latencies = np.array(latencies) * 1e3
+    return {
+        "throughput_per_s": len(latencies) / elapsed,
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p99_ms": float(np.percentile(latencies, 99)),
+        "coalesced": stats["coalesced"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--executor", choices=("thread", "process"))
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.repeat)
+    if args.executor:
+        results.update(run_concurrent(args.executor, args.clients, args.rows))
+    for name, value in results.items():
+        print(f"{name:24s} {value:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Bulk report generation for a roster of patients.
+
+A roster is a CSV with one patient per row: an optional ``patient_id``
+column (the row number otherwise) and either a ``symptoms`` column with
+names separated by ``,``, ``;`` or ``|``, or ``Symptom_1`` ... columns laid
+out like ``symptoms_df.csv``.
+
+``generate`` scores the whole roster with one ``core.predict_batch`` call and
+groups the patients by predicted disease. The groups, split into chunks of
+``chunk`` patients, go to a process pool. A worker renders each disease's
+report body once and only prepends the per-patient header (id and
+symptoms). The parent writes finished chunks into one zip archive as they
+complete, with a bounded number of chunks in flight, so memory does not
+grow with the roster. The archive holds one Markdown report per patient plus
+``summary.csv``. Every scored patient is recorded in the audit log
+(``MEDIGUIDE_AUDIT_DIR``) like an interactive prediction. Given a registry
+``version``, that version scores the roster, supplies the reports and is
+logged as the model.
+
+Usage::
+
+    python -m mediguide.bulk roster.csv [--out reports.zip] [--workers 4] [--chunk 500]
+    python -m mediguide.bulk --synthetic 20000 [--workers 0]
+
+``--synthetic`` samples a roster from the ``symptoms_df.csv`` distribution;
+``--workers 0`` renders in-process for comparison.
+"""
+import argparse
+import collections
+import csv
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from mediguide import audit, core
+from mediguide.loadgen import normalize_symptom
+from mediguide.vocabulary import symptoms_dict
+
+
+ID_COLUMN = "patient_id"
+SUMMARY_FILE = "summary.csv"
+
+PATIENT_HEADER = "# MediGuide Report: {patient_id}\n\n**Reported symptoms:** {symptoms}\n\n"
+
+SAFETY_NOTICE = (
+    "> **Important Safety Notice:** This analysis is not a substitute for professional medical advice. "
+    "Always consult a qualified healthcare provider for diagnosis and treatment. "
+    "In emergencies, call your local emergency number immediately."
+)
+
+
+class RosterError(ValueError):
+    """Raised for roster rows that cannot be scored"""
+
+
+# ---------------------- Roster ----------------------
+def read_roster(source):
+    """``(patient ids, symptom name lists)`` of a roster CSV path or file object"""
+    try:
+        data = pd.read_csv(source, dtype=str, keep_default_na=False)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as error:
+        raise RosterError(f"Roster is not a readable CSV: {error}") from error
+    if "symptoms" in data.columns:
+        cells = [re.split(r"[,;|]", value) for value in data["symptoms"]]
+    else:
+        columns = [column for column in data.columns if column.lower().startswith("symptom")]
+        if not columns:
+            raise RosterError("Roster has neither a 'symptoms' column nor Symptom_* columns")
+        cells = data[columns].to_numpy().tolist()
+    ids = data[ID_COLUMN].tolist() if ID_COLUMN in data.columns else [str(i + 1) for i in range(len(data))]
+
+    symptom_sets, problems = [], []
+    for line, values in enumerate(cells, 2):
+        names = list(dict.fromkeys(normalize_symptom(value).lower() for value in values if value.strip()))
+        unknown = [name for name in names if name not in symptoms_dict]
+        if unknown:
+            problems.append(f"line {line}: unknown symptoms {unknown}")
+        elif not names:
+            problems.append(f"line {line}: no symptoms")
+        symptom_sets.append(names)
+    duplicates = sorted(name for name, n in collections.Counter(map(report_name, ids)).items() if n > 1)
+    if duplicates:
+        problems.append(f"duplicate patient ids {duplicates[:5]}")
+    if problems:
+        raise RosterError("; ".join(problems[:10]))
+    return ids, symptom_sets
+
+
+def report_name(patient_id):
+    """Archive member name of a patient's report"""
+    return re.sub(r"[^\w.-]+", "_", str(patient_id)) + ".md"
+
+
+# ---------------------- Rendering ----------------------
+@lru_cache(maxsize=None)
+def disease_template(disease_id):
+    """Patient-independent body of a disease's report, rendered once per process"""
+    return report_body(core.get_report(disease_id))
+
+
+def report_body(report):
+    """Markdown body of a ``Report``"""
+    lines = [f"## Predicted condition: {report.disease}", "", report.description, ""]
+    for title, items in (
+        ("Precautions", report.precautions),
+        ("Medications", report.medications),
+        ("Diet Plan", report.diets),
+        ("Fitness", report.workouts),
+    ):
+        lines.append(f"### {title}")
+        lines.extend(f"- {item}" for item in items if item)
+        lines.append("")
+    lines.append(SAFETY_NOTICE)
+    return "\n".join(lines) + "\n"
+
+
+def render_group(disease_id, patients, body=None):
+    """``(member name, bytes)`` of the reports of ``patients`` sharing one predicted disease"""
+    body = body or disease_template(disease_id)
+    return [
+        (report_name(patient_id), (PATIENT_HEADER.format(
+            patient_id=patient_id,
+            symptoms=", ".join(symptom.replace("_", " ").title() for symptom in symptoms),
+        ) + body).encode())
+        for patient_id, symptoms in patients
+    ]
+
+
+def plan(ids, symptom_sets, disease_ids, chunk):
+    """``(disease_id, patients)`` tasks: patients grouped by disease, at most ``chunk`` per task"""
+    order = np.argsort(disease_ids, kind="stable")
+    for group in np.split(order, np.flatnonzero(np.diff(disease_ids[order])) + 1):
+        if not len(group):
+            continue
+        disease_id = int(disease_ids[group[0]])
+        for start in range(0, len(group), chunk):
+            yield disease_id, [(ids[i], symptom_sets[i]) for i in group[start:start + chunk]]
+
+
+def with_bodies(tasks, version):
+    """``plan`` tasks carrying the report body of a registry version, rendered once per disease"""
+    # Worker processes only know the core catalog, so the version's bodies travel with the tasks
+    bodies = {}
+    for disease_id, patients in tasks:
+        if disease_id not in bodies:
+            bodies[disease_id] = report_body(version.report(disease_id))
+        yield disease_id, patients, bodies[disease_id]
+
+
+def _warm_up():
+    core.get_catalog()
+
+
+# ---------------------- Engine ----------------------
+def generate(ids, symptom_sets, out, workers=None, chunk=500, version=None):
+    """Score, render and zip the reports of a roster; returns timing counters.
+
+    ``version`` is an optional registry ``ModelVersion`` used instead of the
+    core model and catalog.
+    """
+    start = time.perf_counter()
+    if version is None:
+        disease_ids = core.predict_batch(symptom_sets)
+        label = None  # the audit log's default: the served model
+    else:
+        disease_ids = np.asarray(version.model.predict(core.encode_batch(symptom_sets)), dtype=np.int64)
+        label = audit.version_label(version.name, version.model_hash)
+    log = core.get_audit_log()
+    if log is not None:
+        for symptoms, disease_id in zip(symptom_sets, disease_ids.tolist()):
+            log.record(core.encode_key(symptoms), disease_id, label)
+    scored = time.perf_counter()
+
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        written = 0
+
+        def write(entries):
+            nonlocal written
+            for name, data in entries:
+                archive.writestr(name, data)
+            written += len(entries)
+
+        tasks = plan(ids, symptom_sets, disease_ids, chunk)
+        if version is not None:
+            tasks = with_bodies(tasks, version)
+        if workers == 0:
+            for task in tasks:
+                write(render_group(*task))
+        else:
+            # Forked workers inherit the loaded catalog; loader threads must not be mid-import
+            core.wait_ready()
+            _warm_up()
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(workers, initializer=_warm_up) as pool:
+                pending = set()
+                for task in tasks:
+                    pending.add(pool.submit(render_group, *task))
+                    if len(pending) >= 2 * workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            write(future.result())
+                for future in wait(pending).done:
+                    write(future.result())
+
+        summary = io.StringIO()
+        writer = csv.writer(summary)
+        writer.writerow([ID_COLUMN, "disease", "report"])
+        for patient_id, disease_id in zip(ids, disease_ids.tolist()):
+            writer.writerow([patient_id, core.disease_name(disease_id), report_name(patient_id)])
+        archive.writestr(SUMMARY_FILE, summary.getvalue())
+
+    elapsed = time.perf_counter() - start
+    return {
+        "patients": written,
+        "diseases": len(np.unique(disease_ids)),
+        "score_s": scored - start,
+        "render_write_s": elapsed - (scored - start),
+        "total_s": elapsed,
+        "patients_per_s": written / elapsed if elapsed else 0.0,
+    }
+
+
+def synthetic_roster(n, seed=0):
+    """``n`` patients sampled from the ``symptoms_df.csv`` distribution"""
+    from mediguide.loadgen import SymptomDistribution
+    from mediguide.session_store import symptom_indices
+    from mediguide.vocabulary import symptom_names
+
+    distribution = SymptomDistribution.from_symptoms_df(core.resolve_path("symptoms_df.csv"))
+    keys = distribution.sample(n, np.random.default_rng(seed), drop=0.2)
+    return [f"P{i + 1:06d}" for i in range(n)], [[symptom_names[i] for i in symptom_indices(key)] for key in keys]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate one report per patient of a roster into a zip archive")
+    parser.add_argument("roster", nargs="?", help="roster CSV")
+    parser.add_argument("--synthetic", type=int, default=0, help="sample this many patients instead of a roster")
+    parser.add_argument("--out", default="reports.zip")
+    parser.add_argument("--workers", type=int, default=None, help="render processes, 0 = in-process")
+    parser.add_argument("--chunk", type=int, default=500, help="patients per rendering task")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        ids, symptom_sets = synthetic_roster(args.synthetic)
+    elif args.roster:
+        try:
+            ids, symptom_sets = read_roster(args.roster)
+        except RosterError as error:
+            print(f"invalid roster: {error}", file=sys.stderr)
+            return 1
+    else:
+        parser.error("give a roster CSV or --synthetic N")
+
+    core.get_model()  # load once up front so the timings cover only the bulk run
+    results = generate(ids, symptom_sets, args.out, args.workers, args.chunk)
+    for name, value in results.items():
+        print(f"{name:24s} {value:12.2f}")
+    print(f"archive: {os.path.getsize(args.out):,} bytes -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
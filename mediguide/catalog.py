@@ -0,0 +1,286 @@
+"""Normalized recommendation tables.
+
+The recommendation CSVs ship in three different shapes: ``medications.csv``
+and ``diets.csv`` store Python list literals as strings, ``precautions_df.csv``
+spreads items over ``Precaution_N`` columns and ``workout_df.csv`` has one row
+per item. ``load_catalog`` parses all of them once into integer item ids:
+every distinct string is stored once in a ``StringPool`` and every section
+maps a disease id to a contiguous slice of an ``int32`` id array (CSR layout),
+so serving a report is a couple of array slices and pool lookups.
+
+The join between model label ids and table rows happens once, in
+``join_table``: names are matched after whitespace normalization and the
+explicit ``disease_aliases`` spellings, and any label without rows or row
+without a label raises ``CatalogError`` instead of silently serving an empty
+section. ``python -m mediguide.catalog`` runs the same check as a build step.
+"""
+import argparse
+import ast
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+SECTIONS = ("description", "precautions", "medications", "diets", "workouts")
+
+TABLE_FILES = {
+    "description": "description.csv",
+    "precautions": "precautions_df.csv",
+    "medications": "medications.csv",
+    "diets": "diets.csv",
+    "workouts": "workout_df.csv",
+}
+
+
+class CatalogError(ValueError):
+    """Model labels and recommendation tables do not join"""
+
+
+# ---------------------- String Pool ----------------------
+class StringPool:
+    """Interned strings addressed by dense integer ids"""
+
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self):
+        self.strings = []
+        self._ids = {}
+
+    def intern(self, text):
+        """Return the id of ``text``, adding it to the pool on first sight"""
+        item_id = self._ids.get(text)
+        if item_id is None:
+            item_id = len(self.strings)
+            text = sys.intern(text)
+            self.strings.append(text)
+            self._ids[text] = item_id
+        return item_id
+
+    def lookup(self, ids):
+        strings = self.strings
+        return [strings[item_id] for item_id in ids]
+
+    def __getitem__(self, item_id):
+        return self.strings[item_id]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+# ---------------------- Sections ----------------------
+class Section:
+    """Disease id -> item ids, stored as CSR ``offsets`` / ``items`` arrays"""
+
+    __slots__ = ("offsets", "items")
+
+    def __init__(self, offsets, items):
+        self.offsets = offsets
+        self.items = items
+
+    @classmethod
+    def from_lists(cls, id_lists):
+        lengths = np.fromiter((len(ids) for ids in id_lists), dtype=np.int32, count=len(id_lists))
+        offsets = np.zeros(len(id_lists) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=offsets[1:])
+        items = np.fromiter((i for ids in id_lists for i in ids), dtype=np.int32, count=int(offsets[-1]))
+        return cls(offsets, items)
+
+    def __getitem__(self, disease_id):
+        return self.items[self.offsets[disease_id]:self.offsets[disease_id + 1]]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class RecommendationCatalog:
+    """All recommendation sections keyed by integer disease id"""
+
+    __slots__ = ("pool", "sections", "disease_names", "rows")
+
+    def __init__(self, pool, sections, disease_names, rows=None):
+        self.pool = pool
+        self.sections = sections
+        self.disease_names = disease_names
+        # Section name -> Section of source-table row offsets per disease id
+        self.rows = rows or {}
+
+    @property
+    def n_diseases(self):
+        return len(self.disease_names)
+
+    def item_ids(self, section, disease_id):
+        return self.sections[section][disease_id]
+
+    def items(self, section, disease_id):
+        return self.pool.lookup(self.item_ids(section, disease_id))
+
+    def description(self, disease_id, default="No description available."):
+        ids = self.item_ids("description", disease_id)
+        return self.pool[ids[0]] if len(ids) else default
+
+    def report(self, disease_id):
+        """Item ids of every section for one disease"""
+        return tuple(self.item_ids(section, disease_id) for section in SECTIONS)
+
+    def nbytes(self):
+        arrays = sum(s.offsets.nbytes + s.items.nbytes for s in self.sections.values())
+        strings = sum(sys.getsizeof(text) for text in self.pool.strings)
+        return arrays + strings
+
+
+# ---------------------- Parsing ----------------------
+def compact_table(df, max_category_ratio=0.5):
+    """Drop exported index columns and store repetitive strings and small ints compactly.
+
+    ``Unnamed: N`` columns are the index written by ``to_csv`` and are
+    dropped, object columns with few distinct values become categoricals
+    and integer columns are downcast to the smallest dtype that holds them.
+    """
+    df = df.drop(columns=[c for c in df.columns if str(c).startswith("Unnamed")])
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_string_dtype(values) and values.nunique() <= max_category_ratio * len(values):
+            df[column] = values.astype("category")
+        elif pd.api.types.is_integer_dtype(values):
+            df[column] = pd.to_numeric(values, downcast="unsigned" if values.min() >= 0 else "integer")
+    return df
+
+
+def parse_list_literal(value):
+    """Parse a ``"['a', 'b']"`` cell into a list of stripped strings"""
+    if not isinstance(value, str):
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        parsed = value.strip("[]").split(",")
+    if isinstance(parsed, str):
+        parsed = [parsed]
+    return [str(item).strip(" '\"") for item in parsed if str(item).strip(" '\"")]
+
+
+def _column_items(df, columns):
+    """Non-empty stripped cells of ``columns`` per row"""
+    return [
+        [str(value).strip() for value in row if isinstance(value, str) and value.strip()]
+        for row in df[columns].itertuples(index=False)
+    ]
+
+
+# ---------------------- Join ----------------------
+def normalize_name(name, aliases=None):
+    """Canonical spelling of a disease name: collapsed whitespace, then ``aliases``"""
+    name = " ".join(name.split())
+    return aliases.get(name, name) if aliases else name
+
+
+def join_table(diseases, names, aliases=None):
+    """Row offsets of every label id in a table's ``Disease`` column.
+
+    Returns ``(rows, missing, unknown)``: a ``Section`` of row offsets per
+    label id, the label names without any row and the table names that match
+    no label. Rows without a name (broken CSV lines) are skipped.
+    """
+    n_diseases = max(diseases) + 1
+    label_ids = {normalize_name(name, aliases): label for label, name in diseases.items()}
+    rows = [[] for _ in range(n_diseases)]
+    unknown = set()
+    for offset, name in enumerate(names):
+        if not isinstance(name, str):
+            continue
+        label = label_ids.get(normalize_name(name, aliases))
+        if label is None:
+            unknown.add(name)
+        else:
+            rows[label].append(offset)
+    missing = [diseases[label] for label in sorted(diseases) if not rows[label]]
+    return Section.from_lists(rows), missing, sorted(unknown)
+
+
+def join_tables(diseases, tables, aliases=None):
+    """``join_table`` for every section, raising ``CatalogError`` on any unmatched name"""
+    joins, problems = {}, []
+    for section, table in tables.items():
+        joins[section], missing, unknown = join_table(diseases, table["Disease"], aliases)
+        if missing:
+            problems.append(f"{section}: no rows for {missing}")
+        if unknown:
+            problems.append(f"{section}: unknown diseases {unknown}")
+    if problems:
+        raise CatalogError("Recommendation tables do not match the model labels:\n  " + "\n  ".join(problems))
+    return joins
+
+
+def build_catalog(diseases, description, precautions, medications, diets, workouts, aliases=None):
+    """Join the five recommendation DataFrames to the label ids into a ``RecommendationCatalog``.
+
+    ``diseases`` maps model label ids to disease names. Every label must have
+    rows in every table (see ``join_tables``); the items of those rows are
+    interned in row order.
+    """
+    tables = {
+        "description": description,
+        "precautions": precautions,
+        "medications": medications,
+        "diets": diets,
+        "workouts": workouts,
+    }
+    joins = join_tables(diseases, tables, aliases)
+
+    precaution_columns = [c for c in precautions.columns if c.startswith("Precaution")]
+    row_items = {
+        "description": _column_items(description, ["Description"]),
+        "precautions": _column_items(precautions, precaution_columns),
+        "medications": [parse_list_literal(value) for value in medications["Medication"]],
+        "diets": [parse_list_literal(value) for value in diets["Diet"]],
+        "workouts": _column_items(workouts, ["workout"]),
+    }
+
+    n_diseases = max(diseases) + 1
+    pool = StringPool()
+    sections = {}
+    for section in SECTIONS:
+        rows, items = joins[section], row_items[section]
+        sections[section] = Section.from_lists([
+            [pool.intern(item) for offset in rows[label] for item in items[offset]]
+            for label in range(n_diseases)
+        ])
+    disease_names = [diseases.get(i, "") for i in range(n_diseases)]
+    return RecommendationCatalog(pool, sections, disease_names, joins)
+
+
+def load_catalog(diseases, data_dir=".", aliases=None):
+    """Read the recommendation CSVs from ``data_dir`` and build the catalog"""
+    tables = {
+        section: compact_table(pd.read_csv(os.path.join(data_dir, name)))
+        for section, name in TABLE_FILES.items()
+    }
+    return build_catalog(diseases, *(tables[section] for section in SECTIONS), aliases=aliases)
+
+
+# ---------------------- Check ----------------------
+def main(argv=None):
+    from mediguide import core
+    from mediguide.vocabulary import disease_aliases, diseases_list
+
+    parser = argparse.ArgumentParser(description="Check that every model label joins every recommendation table")
+    parser.add_argument("--data-dir", default=None)
+    args = parser.parse_args(argv)
+
+    data_dir = os.path.dirname(core.resolve_path("description.csv", args.data_dir))
+    try:
+        catalog = load_catalog(diseases_list, data_dir, disease_aliases)
+    except CatalogError as error:
+        print(error, file=sys.stderr)
+        return 1
+    for section in SECTIONS:
+        rows = catalog.rows[section]
+        print(f"{section:12s} {len(rows.items):5d} rows joined to {len(rows)} labels")
+    print(f"catalog: {len(catalog.pool)} strings, {catalog.nbytes():,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Symptom co-occurrence matrix for related-symptom suggestions.
+
+``SymptomCooccurrence`` keeps three count arrays built offline from
+``Training.csv``:
+
+* ``pairs``        -- (132, 132) number of cases reporting both symptoms;
+  the diagonal is the number of cases reporting each symptom
+* ``profiles``     -- (41, 132) number of cases of each disease reporting
+  each symptom
+* ``class_counts`` -- (41,) number of cases of each disease
+
+Suggestions come from the per-disease profiles. Each disease is read as a
+distribution over the symptoms a patient with it reports, ``Q(j | d)``: its
+smoothed symptom frequencies normalized to sum to one. The selected set
+weights the diseases by ``P(d) * prod Q(i | d)`` and a symptom scores the
+weighted ``Q(j | d)``: the chance it is the next one this patient names.
+Diseases with few symptoms, most of them already selected, weigh the most,
+so ``itching`` suggests ``skin_rash`` and ``nodal_skin_eruptions`` (fungal
+infection) rather than the ``fatigue`` shared by every itchy disease.
+``_refresh`` precomputes ``Q`` and its log, so a suggestion is one column
+gather, one sum and one (41,) x (41, 132) product. New cases (e.g. from the
+audit log) are folded in with ``update``, which adds two small matrix
+products to the counts.
+
+The counts are saved as ``symptom_cooccurrence.npz`` (upper triangle only,
+smallest integer dtype) and loaded by ``core.start_loading`` next to the
+other assets; without the file the core builds it from ``Training.csv``.
+
+Usage::
+
+    python -m mediguide.cooccurrence [--audit audit/] [--out symptom_cooccurrence.npz]
+                                     [--suggest itching skin_rash]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+COOCCURRENCE_FILE = "symptom_cooccurrence.npz"
+
+
+class SymptomCooccurrence:
+    """Pairwise and per-disease symptom counts with precomputed per-disease symptom distributions"""
+
+    def __init__(self, pairs, profiles, class_counts, alpha=1.0):
+        self.pairs = np.asarray(pairs, dtype=np.int64)
+        self.profiles = np.asarray(profiles, dtype=np.int64)
+        self.class_counts = np.asarray(class_counts, dtype=np.int64)
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._refresh()
+
+    @classmethod
+    def empty(cls, n_symptoms, n_diseases, alpha=1.0):
+        return cls(np.zeros((n_symptoms, n_symptoms)), np.zeros((n_diseases, n_symptoms)),
+                   np.zeros(n_diseases), alpha)
+
+    def _refresh(self):
+        # Laplace smoothing keeps the logs finite for symptoms a disease never showed
+        emission = self.profiles + self.alpha
+        self._emission = emission / emission.sum(axis=1, keepdims=True)
+        self._log_emission = np.log(self._emission)
+        self._log_prior = np.log(self.class_counts + self.alpha)
+
+    @property
+    def n_symptoms(self):
+        return self.pairs.shape[0]
+
+    @property
+    def n_cases(self):
+        return int(self.class_counts.sum())
+
+    @property
+    def nbytes(self):
+        return (self.pairs.nbytes + self.profiles.nbytes + self.class_counts.nbytes
+                + self._emission.nbytes + self._log_emission.nbytes + self._log_prior.nbytes)
+
+    # ---------------------- Queries ----------------------
+    def conditional(self):
+        """(132, 132) P(j | i): share of the cases with symptom i that also report j"""
+        counts = np.diagonal(self.pairs)
+        return np.divide(self.pairs, counts[:, None], out=np.zeros(self.pairs.shape), where=counts[:, None] > 0)
+
+    def suggest(self, indices, n=5):
+        """Up to ``n`` symptom indices most likely to accompany the selected ``indices``"""
+        indices = list(indices)
+        if not indices:
+            # Nothing selected yet: the most frequently reported symptoms
+            scores = np.diagonal(self.pairs).astype(np.float64)
+            scores[scores == 0] = -np.inf
+        else:
+            # How well each disease explains the selection, scaled to a max of 1 to keep exp finite
+            log_weights = self._log_prior + self._log_emission[:, indices].sum(axis=1)
+            scores = np.exp(log_weights - log_weights.max()) @ self._emission
+            # Symptoms never seen with any selected one are no suggestion at all
+            scores[~self.pairs[indices].any(axis=0)] = -np.inf
+            scores[indices] = -np.inf
+        n = min(n, len(scores))
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [int(i) for i in top if np.isfinite(scores[i])]
+
+    def profile(self, disease_id, n=None):
+        """``(symptom index, P(symptom | disease))`` pairs of a disease, most frequent first"""
+        total = self.class_counts[disease_id]
+        if total == 0:
+            return []
+        frequencies = self.profiles[disease_id] / total
+        order = np.argsort(-frequencies, kind="stable")
+        return [(int(i), float(frequencies[i])) for i in order[:n] if frequencies[i] > 0]
+
+    # ---------------------- Updates ----------------------
+    def update(self, features, disease_ids):
+        """Fold new cases in: ``features`` is an (n, 132) 0/1 matrix, ``disease_ids`` their labels"""
+        features = np.asarray(features, dtype=np.int64)
+        disease_ids = np.asarray(disease_ids, dtype=np.int64)
+        known = (disease_ids >= 0) & (disease_ids < len(self.class_counts))
+        with self._lock:
+            pairs = self.pairs + features.T @ features
+            profiles = self.profiles.copy()
+            np.add.at(profiles, disease_ids[known], features[known])
+            # Swap whole arrays so concurrent readers never see half an update
+            self.pairs, self.profiles = pairs, profiles
+            self.class_counts = self.class_counts + np.bincount(disease_ids[known], minlength=len(self.class_counts))
+            self._refresh()
+
+    # ---------------------- Persistence ----------------------
+    def save(self, path):
+        upper = self.pairs[np.triu_indices(self.n_symptoms)]
+        np.savez_compressed(
+            path,
+            pairs=upper.astype(np.min_scalar_type(upper.max(initial=0))),
+            profiles=self.profiles.astype(np.min_scalar_type(self.profiles.max(initial=0))),
+            class_counts=self.class_counts.astype(np.min_scalar_type(self.class_counts.max(initial=0))),
+            alpha=np.float64(self.alpha),
+        )
+
+    @classmethod
+    def load(cls, file):
+        """Load from a path or file object written by ``save``"""
+        with np.load(file) as data:
+            profiles = data["profiles"]
+            n_symptoms = profiles.shape[1]
+            pairs = np.zeros((n_symptoms, n_symptoms), dtype=np.int64)
+            rows, columns = np.triu_indices(n_symptoms)
+            pairs[rows, columns] = data["pairs"]
+            pairs[columns, rows] = data["pairs"]
+            return cls(pairs, profiles, data["class_counts"], float(data["alpha"]))
+
+
+def build_cooccurrence(training, label_column="prognosis", alpha=1.0):
+    """Count matrices from the training DataFrame, diseases in ``LabelEncoder`` order"""
+    features = training.drop(columns=[label_column]).to_numpy(dtype=np.int64)
+    labels, classes = pd.factorize(training[label_column], sort=True)
+    cooccurrence = SymptomCooccurrence.empty(features.shape[1], len(classes), alpha)
+    cooccurrence.update(features, labels)
+    return cooccurrence
+
+
+def audit_features(records, n_symptoms):
+    """``(features, disease_ids)`` of an audit record array, unpacked without Python loops"""
+    bits = np.unpackbits(records["symptoms"], axis=1, bitorder="little")
+    return bits[:, :n_symptoms], records["disease"].astype(np.int64)
+
+
+def main(argv=None):
+    from mediguide import core
+    from mediguide.vocabulary import symptom_names, symptoms_dict
+
+    parser = argparse.ArgumentParser(description="Build the symptom co-occurrence matrix and try suggestions")
+    parser.add_argument("--data", default=None, help="labeled CSV to count (default: Training.csv)")
+    parser.add_argument("--audit", default=None, help="audit log directory whose predictions are folded in")
+    parser.add_argument("--out", default=None, help=f"output .npz (default: {COOCCURRENCE_FILE} next to the data)")
+    parser.add_argument("--suggest", nargs="*", default=["itching"], help="symptoms to suggest for")
+    parser.add_argument("-n", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    data_path = args.data or core.resolve_path("Training.csv")
+    start = time.perf_counter()
+    cooccurrence = build_cooccurrence(pd.read_csv(data_path))
+    print(f"{cooccurrence.n_cases} cases counted in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    if args.audit:
+        from mediguide import audit
+
+        before = cooccurrence.n_cases
+        for records in audit.read_records(args.audit):
+            cooccurrence.update(*audit_features(records, cooccurrence.n_symptoms))
+        print(f"{cooccurrence.n_cases - before} audited cases folded in")
+
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(data_path)), COOCCURRENCE_FILE)
+    cooccurrence.save(out)
+    print(f"{cooccurrence.nbytes:,} bytes in memory, file: {os.path.getsize(out):,} bytes -> {out}")
+
+    selected = [symptoms_dict[name] for name in args.suggest]
+    repeat = 10_000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        suggestions = cooccurrence.suggest(selected, args.n)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"suggestions for {args.suggest}: {[symptom_names[i] for i in suggestions]} ({elapsed * 1e6:.1f}us)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""Shared serving core for every MediGuide front-end.
+
+Loading, input encoding, prediction and recommendation lookup live here so
+``app.py``, ``index.py`` and ``final_app.py`` all run the same cached hot path.
+Everything loaded from disk is cached per process with ``functools.lru_cache``
+(the same lifetime as ``st.cache_resource``), predictions are memoized on the
+bit-packed symptom key and reports on the disease id.
+
+``start_loading`` reads all of those files concurrently in the background
+(see ``mediguide.loader``); the getters then block only until the asset they
+need has arrived.
+"""
+import io
+import os
+import pickle
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from mediguide import audit
+from mediguide.catalog import SECTIONS, TABLE_FILES, build_catalog, compact_table, load_catalog
+from mediguide.cooccurrence import COOCCURRENCE_FILE, SymptomCooccurrence, build_cooccurrence
+from mediguide.distill import DistilledModel
+from mediguide.ensemble import load_ensemble
+from mediguide.loader import AssetLoader, load_checksums, read_bytes
+from mediguide.quantize import QuantizedSVC
+from mediguide.questionnaire import build_statistics, load_statistics
+from mediguide.session_store import symptom_indices, symptom_key
+from mediguide.vocabulary import N_SYMPTOMS, disease_aliases, diseases_list, symptoms_dict
+
+
+# ---------------------- Paths ----------------------
+DATA_DIR = os.environ.get(
+    "MEDIGUIDE_DATA_DIR",
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# svc.pkl by default; quantized (mediguide.quantize) and distilled (mediguide.distill) .npz exports also work
+MODEL_FILE = os.environ.get("MEDIGUIDE_MODEL", "svc.pkl")
+
+# Directory written by ``python -m mediguide.ensemble export``; serves the weighted-vote ensemble when set
+ENSEMBLE_DIR = os.environ.get("MEDIGUIDE_ENSEMBLE")
+
+# The scripts historically used both a flat layout and Model/ + Dataset/ folders
+SEARCH_DIRS = ("", "Model", "Dataset")
+
+
+def resolve_path(name, data_dir=None):
+    """Locate ``name`` in the data directory or its Model/ and Dataset/ folders"""
+    data_dir = data_dir or DATA_DIR
+    if os.path.isabs(name):
+        return name
+    for folder in SEARCH_DIRS:
+        path = os.path.join(data_dir, folder, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"{name} not found under {data_dir}")
+
+
+# ---------------------- Loading ----------------------
+def load_model(path, data_dir=None):
+    """Load a pickled model, a quantized/distilled ``.npz`` export or an ensemble directory"""
+    if os.path.isdir(path):
+        return load_ensemble(path)
+    if not path.endswith(".npz"):
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    fallback = fallback_path(path, data_dir)
+    if fallback is None:
+        return QuantizedSVC.load(path)
+    with open(fallback, "rb") as file:
+        return DistilledModel.load(path, pickle.load(file))
+
+
+def fallback_path(path, data_dir=None):
+    """The SVC a distilled tree export falls back to for low-confidence leaves, None for other artifacts"""
+    if os.path.isdir(path) or not path.endswith(".npz"):
+        return None
+    with np.load(path) as data:
+        is_tree = "feature" in data.files
+    return resolve_path("svc.pkl", data_dir) if is_tree else None
+
+
+_loader = None
+_loader_pid = None
+
+
+def model_path(data_dir=None):
+    return resolve_path(ENSEMBLE_DIR or MODEL_FILE, data_dir)
+
+
+def cooccurrence_path(data_dir=None):
+    """The prebuilt co-occurrence matrix, or Training.csv to count it from"""
+    try:
+        return resolve_path(COOCCURRENCE_FILE, data_dir)
+    except FileNotFoundError:
+        return resolve_path("Training.csv", data_dir)
+
+
+def load_cooccurrence(path):
+    if path.endswith(".npz"):
+        return SymptomCooccurrence.load(path)
+    return build_cooccurrence(compact_table(pd.read_csv(path)))
+
+
+def start_loading(data_dir=None, checksums=None, max_workers=None, read=read_bytes, install=True):
+    """Start loading the model, recommendation tables, Training.csv and the co-occurrence matrix in the background.
+
+    Returns the ``AssetLoader``; with ``install`` it also backs the getters
+    below (once per process, later calls return the running loader).
+    """
+    global _loader, _loader_pid
+    if install and _active_loader() is not None:
+        return _loader
+
+    def parse_model(data, path):
+        if data is not None and not path.endswith(".npz"):
+            return pickle.loads(data)
+        return load_model(path, data_dir)
+
+    def parse_csv(data, path):
+        return compact_table(pd.read_csv(io.BytesIO(data)))
+
+    def parse_training(data, path):
+        return build_statistics(parse_csv(data, path))
+
+    def parse_cooccurrence(data, path):
+        if path.endswith(".npz"):
+            return SymptomCooccurrence.load(io.BytesIO(data))
+        return build_cooccurrence(parse_csv(data, path))
+
+    assets = {
+        "model": (model_path(data_dir), parse_model),
+        "training": (resolve_path("Training.csv", data_dir), parse_training),
+        "cooccurrence": (cooccurrence_path(data_dir), parse_cooccurrence),
+    }
+    for section, name in TABLE_FILES.items():
+        assets[section] = (resolve_path(name, data_dir), parse_csv)
+    if checksums is None:
+        checksums = load_checksums(data_dir or DATA_DIR)
+
+    loader = AssetLoader(assets, checksums, max_workers, read)
+    if install:
+        _loader, _loader_pid = loader, os.getpid()
+    return loader
+
+
+def _active_loader():
+    """The installed loader, unless this is a forked worker whose loader threads did not survive"""
+    return _loader if _loader_pid == os.getpid() else None
+
+
+def is_ready(asset=None):
+    """True when nothing (or not ``asset``) is loading in the background; see ``load_errors`` for failures"""
+    loader = _active_loader()
+    if loader is None:
+        return True
+    return loader.is_ready(asset) if asset else loader.ready
+
+
+def load_errors():
+    """Background load failures by asset name (e.g. a ``ChecksumError``), empty when all is well.
+
+    A failing audit log is reported as ``audit``: predictions that cannot be
+    recorded are not served.
+    """
+    loader = _active_loader()
+    errors = {} if loader is None else loader.errors()
+    log = get_audit_log()
+    if log is not None and log.error is not None:
+        errors["audit"] = log.error
+    return errors
+
+
+def wait_ready(timeout=None):
+    """Block until background loading has finished, re-raising any load error"""
+    loader = _active_loader()
+    if loader is not None:
+        loader.wait(timeout)
+
+
+@lru_cache(maxsize=None)
+def get_model(data_dir=None):
+    if _active_loader() is not None and data_dir is None:
+        return _loader.result("model")
+    return load_model(model_path(data_dir), data_dir)
+
+
+@lru_cache(maxsize=None)
+def get_catalog(data_dir=None):
+    if _active_loader() is not None and data_dir is None:
+        return _loader.derive(
+            "catalog",
+            lambda *tables: build_catalog(diseases_list, *tables, aliases=disease_aliases),
+            SECTIONS
+        )
+    return load_catalog(diseases_list, os.path.dirname(resolve_path("description.csv", data_dir)), disease_aliases)
+
+
+@lru_cache(maxsize=None)
+def get_questionnaire_stats(data_dir=None):
+    if _active_loader() is not None and data_dir is None:
+        return _loader.result("training")
+    return load_statistics(resolve_path("Training.csv", data_dir))
+
+
+@lru_cache(maxsize=None)
+def get_cooccurrence(data_dir=None):
+    if _active_loader() is not None and data_dir is None:
+        return _loader.result("cooccurrence")
+    return load_cooccurrence(cooccurrence_path(data_dir))
+
+
+@lru_cache(maxsize=None)
+def get_audit_log():
+    """Prediction audit log enabled with ``MEDIGUIDE_AUDIT_DIR``, or None"""
+    return audit.from_env()
+
+
+# ---------------------- Encoding ----------------------
+def encode_key(symptoms):
+    """Bit-packed key of a collection of symptom names"""
+    return symptom_key(symptoms_dict[symptom] for symptom in symptoms)
+
+
+def encode(symptoms):
+    """One-hot (1, 132) feature row for a collection of symptom names"""
+    vector = np.zeros((1, N_SYMPTOMS), dtype=np.float64)
+    vector[0, [symptoms_dict[symptom] for symptom in symptoms]] = 1
+    return vector
+
+
+def encode_batch(symptom_sets):
+    """One-hot (n, 132) feature matrix for many symptom collections"""
+    matrix = np.zeros((len(symptom_sets), N_SYMPTOMS), dtype=np.float64)
+    for row, symptoms in enumerate(symptom_sets):
+        matrix[row, [symptoms_dict[symptom] for symptom in symptoms]] = 1
+    return matrix
+
+
+def decode_key(key):
+    """One-hot (1, 132) feature row for a bit-packed symptom key"""
+    vector = np.zeros((1, N_SYMPTOMS), dtype=np.float64)
+    vector[0, symptom_indices(key)] = 1
+    return vector
+
+
+# ---------------------- Prediction ----------------------
+@lru_cache(maxsize=4096)
+def predict_key(key):
+    """Predict the disease id for a bit-packed symptom key"""
+    return int(get_model().predict(decode_key(key))[0])
+
+
+def predict(symptoms):
+    """Predict the disease id for a collection of symptom names"""
+    return predict_key(encode_key(symptoms))
+
+
+def predict_batch(symptom_sets):
+    """Predict disease ids for many symptom collections with one model call"""
+    if not len(symptom_sets):
+        return np.zeros(0, dtype=np.int64)
+    return get_model().predict(encode_batch(symptom_sets)).astype(np.int64)
+
+
+def disease_name(disease_id):
+    return diseases_list.get(disease_id, "Unknown Disease")
+
+
+# ---------------------- Recommendations ----------------------
+class Report:
+    """Everything a front-end shows for one predicted disease"""
+
+    __slots__ = ("disease_id", "disease", "description") + SECTIONS[1:]
+
+    def __init__(self, disease_id, disease, description, precautions, medications, diets, workouts):
+        self.disease_id = disease_id
+        self.disease = disease
+        self.description = description
+        self.precautions = precautions
+        self.medications = medications
+        self.diets = diets
+        self.workouts = workouts
+
+
+def build_report(catalog, disease_id):
+    """Resolve the recommendation lists of a disease id in ``catalog``"""
+    if not 0 <= disease_id < catalog.n_diseases:
+        return Report(disease_id, disease_name(disease_id), "No description available.", (), (), (), ())
+    return Report(
+        disease_id,
+        disease_name(disease_id),
+        catalog.description(disease_id),
+        *(tuple(catalog.items(section, disease_id)) for section in SECTIONS[1:])
+    )
+
+
+@lru_cache(maxsize=256)
+def get_report(disease_id):
+    """Report of a disease id from the served catalog (cached per disease)"""
+    return build_report(get_catalog(), disease_id)
+
+
+def recommend(symptoms):
+    """Predict and return the ``Report`` for a collection of symptom names"""
+    key = encode_key(symptoms)
+    disease_id = predict_key(key)
+    log = get_audit_log()
+    if log is not None:
+        log.record(key, disease_id)
+    return get_report(disease_id)
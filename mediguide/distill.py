@@ -0,0 +1,241 @@
+"""Distill the SVC into a compiled decision tree for constant-time lookups.
+
+The training data is 41 diseases with a handful of characteristic symptoms
+each, and users mostly report a subset of those symptoms. ``distill`` labels
+the observed symptom patterns and their neighbours (up to ``removals``
+symptoms left out) with the SVC, fits a ``DecisionTreeClassifier`` on them
+and compiles it into flat NumPy arrays. Because every disease is a
+conjunction of symptoms the tree is narrow but deep rather than shallow, yet
+``CompiledTree`` still walks it for one input in about ten microseconds.
+``DistilledModel`` serves the tree and falls back to the SVC for leaves whose
+purity on the distillation set is below ``min_confidence``.
+
+Usage::
+
+    python -m mediguide.distill [--removals 2] [--min-samples-leaf 2]
+                                [--min-confidence 0.99] [--out svc_tree.npz]
+
+prints fidelity and latency of the tree, the tree with fallback and the SVC
+side by side. The export stores ``--min-confidence`` next to the tree, so the
+core serves it with the threshold it was evaluated with.
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------------- Compiled Tree ----------------------
+class CompiledTree:
+    """Decision tree over binary features stored as flat arrays.
+
+    ``feature[node]`` is the symptom tested at an inner node (-1 at leaves),
+    ``absent``/``present`` are the child taken when the symptom is 0/1,
+    ``label`` the class predicted at a node and ``confidence`` its purity.
+    """
+
+    def __init__(self, feature, absent, present, label, confidence):
+        self.feature = feature
+        self.absent = absent
+        self.present = present
+        self.label = label
+        self.confidence = confidence
+        # Plain lists make the per-node Python loop several times faster than NumPy scalars
+        self._feature = feature.tolist()
+        self._absent = absent.tolist()
+        self._present = present.tolist()
+
+    @classmethod
+    def from_sklearn(cls, tree):
+        inner = tree.tree_
+        value = inner.value[:, 0, :]
+        totals = value.sum(axis=1)
+        return cls(
+            np.where(inner.children_left >= 0, inner.feature, -1).astype(np.int16),
+            inner.children_left.astype(np.int32),
+            inner.children_right.astype(np.int32),
+            tree.classes_[value.argmax(axis=1)].astype(np.int16),
+            (value.max(axis=1) / np.where(totals > 0, totals, 1)).astype(np.float32),
+        )
+
+    def leaf(self, x):
+        """Leaf index reached by one binary feature row"""
+        feature, absent, present = self._feature, self._absent, self._present
+        node = 0
+        while feature[node] >= 0:
+            node = present[node] if x[feature[node]] else absent[node]
+        return node
+
+    def leaves(self, X):
+        return np.fromiter((self.leaf(row) for row in np.asarray(X) != 0), dtype=np.int32, count=len(X))
+
+    def predict(self, X):
+        return self.label[self.leaves(X)].astype(np.int64)
+
+    @property
+    def depth(self):
+        depth = np.zeros(len(self.feature), dtype=np.int32)
+        for node in range(len(self.feature)):
+            if self.feature[node] >= 0:
+                depth[self.absent[node]] = depth[self.present[node]] = depth[node] + 1
+        return int(depth.max())
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.absent, self.present, self.label, self.confidence))
+
+    def save(self, path, **extra):
+        np.savez(path, feature=self.feature, absent=self.absent, present=self.present,
+                 label=self.label, confidence=self.confidence, **extra)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["feature"], data["absent"], data["present"], data["label"], data["confidence"])
+
+
+class DistilledModel:
+    """Compiled tree with SVC fallback for low-confidence leaves"""
+
+    def __init__(self, tree, fallback, min_confidence=0.99):
+        self.tree = tree
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.classes_ = getattr(fallback, "classes_", None)
+        self.fallbacks = 0
+
+    def predict(self, X):
+        X = np.asarray(X)
+        leaves = self.tree.leaves(X)
+        predictions = self.tree.label[leaves].astype(np.int64)
+        unsure = np.flatnonzero(self.tree.confidence[leaves] < self.min_confidence)
+        if len(unsure):
+            self.fallbacks += len(unsure)
+            predictions[unsure] = self.fallback.predict(X[unsure])
+        return predictions
+
+    def save(self, path):
+        """Write the tree with its fallback threshold; the fallback model is not included"""
+        self.tree.save(path, min_confidence=np.float64(self.min_confidence))
+
+    @classmethod
+    def load(cls, path, fallback):
+        """Load a tree written by ``save``; exports without a threshold use the default"""
+        with np.load(path) as data:
+            min_confidence = float(data["min_confidence"]) if "min_confidence" in data.files else 0.99
+        return cls(CompiledTree.load(path), fallback, min_confidence)
+
+
+# ---------------------- Distillation ----------------------
+def symptom_space(X, removals=1):
+    """Observed binary patterns plus every variant with up to ``removals`` symptoms left out"""
+    frontier = np.unique(np.asarray(X) != 0, axis=0)
+    variants = [frontier]
+    for _ in range(removals):
+        reduced = []
+        for row in frontier:
+            present = np.flatnonzero(row)
+            rows = np.repeat(row[None, :], len(present), axis=0)
+            rows[np.arange(len(present)), present] = False
+            reduced.append(rows)
+        frontier = np.unique(np.vstack(reduced), axis=0)
+        variants.append(frontier)
+    space = np.unique(np.vstack(variants), axis=0)
+    return space[space.any(axis=1)].astype(np.float64)
+
+
+def distill(model, X, removals=2, max_depth=None, min_samples_leaf=2, random_state=0):
+    """Fit and compile a decision tree that mimics ``model`` around ``X``"""
+    from sklearn.tree import DecisionTreeClassifier
+
+    space = symptom_space(X, removals)
+    tree = DecisionTreeClassifier(
+        max_depth=max_depth,
+        min_samples_leaf=min_samples_leaf,
+        random_state=random_state
+    )
+    tree.fit(space, model.predict(space))
+    return CompiledTree.from_sklearn(tree)
+
+
+# ---------------------- Report ----------------------
+def random_dropouts(X, keep=0.7, copies=4, seed=0):
+    """Observed patterns with random symptoms dropped, mostly outside the distillation set"""
+    observed = np.unique(np.asarray(X) != 0, axis=0)
+    masks = np.random.default_rng(seed).random((copies,) + observed.shape) < keep
+    dropped = np.unique((observed[None, :, :] & masks).reshape(-1, observed.shape[1]), axis=0)
+    return dropped[dropped.any(axis=1)].astype(np.float64)
+
+
+def _per_row_us(predict, X, limit=2000):
+    rows = X[:limit]
+    start = time.perf_counter()
+    for i in range(len(rows)):
+        predict(rows[i:i + 1])
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def compare(model, tree, datasets, min_confidence):
+    """Fidelity (agreement with ``model``) and single-row latency per dataset"""
+    distilled = DistilledModel(tree, model, min_confidence)
+    rows = []
+    for name, X in datasets.items():
+        reference = model.predict(X)
+        distilled.fallbacks = 0
+        with_fallback = distilled.predict(X)
+        rows.append({
+            "dataset": name,
+            "rows": len(X),
+            "tree_fidelity": float((tree.predict(X) == reference).mean()),
+            "fallback_fidelity": float((with_fallback == reference).mean()),
+            "fallback_rate": distilled.fallbacks / len(X),
+            "tree_us": _per_row_us(tree.predict, X),
+            "fallback_us": _per_row_us(distilled.predict, X),
+            "svc_us": _per_row_us(model.predict, X, limit=500),
+        })
+    return pd.DataFrame(rows).set_index("dataset")
+
+
+def main(argv=None):
+    from mediguide import core
+
+    parser = argparse.ArgumentParser(description="Distill svc.pkl into a compiled decision tree")
+    parser.add_argument("--removals", type=int, default=2)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--min-samples-leaf", type=int, default=2)
+    parser.add_argument("--min-confidence", type=float, default=0.99)
+    parser.add_argument("--data", default=None, help="labeled CSV (default: Training.csv)")
+    parser.add_argument("--out", default=None, help="output .npz (default: svc_tree.npz next to svc.pkl)")
+    args = parser.parse_args(argv)
+
+    model_path = core.resolve_path("svc.pkl")
+    with open(model_path, "rb") as file:
+        model = pickle.load(file)
+    data = pd.read_csv(args.data or core.resolve_path("Training.csv"))
+    X = data.drop(columns=["prognosis"]).to_numpy(dtype=np.float64)
+
+    tree = distill(model, X, args.removals, args.max_depth, args.min_samples_leaf)
+    print(f"tree: {len(tree.feature)} nodes, depth {tree.depth}, {tree.nbytes:,} bytes")
+
+    datasets = {
+        "training": X,
+        "neighbours": symptom_space(X, args.removals),
+        "held_out": random_dropouts(X),
+        "held_out_sparse": random_dropouts(X, keep=0.5, seed=1),
+    }
+    with pd.option_context("display.width", 160, "display.max_columns", 20,
+                           "display.float_format", "{:.3f}".format):
+        print(compare(model, tree, datasets, args.min_confidence))
+
+    out = args.out or os.path.join(os.path.dirname(model_path), "svc_tree.npz")
+    DistilledModel(tree, model, args.min_confidence).save(out)
+    print(f"saved with min_confidence {args.min_confidence} -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""Ensemble of the notebook models with per-member latency budgets.
+
+``Madicine Recomendation System.ipynb`` compares an SVC, RandomForest,
+GradientBoosting, MultinomialNB and KNN but only ships the SVC. ``export``
+retrains the other four with the notebook's settings and split, pickles them
+next to ``svc.pkl`` in a models directory and writes a ``manifest.json``
+with their weights and latency budgets. Every member scores 100% on the
+notebook's held-out rows, so the weights come from accuracy on those rows
+with half of the symptoms dropped, where the members do differ: a member
+with accuracy ``p`` gets the weighted-majority weight ``log((K - 1) p / (1 -
+p))`` over ``K`` classes.
+
+``Ensemble.predict`` encodes the batch once, runs every member's
+``predict`` concurrently on a thread pool (the tree, neighbour and BLAS
+kernels release the GIL) and combines the answers by weighted vote; a tie
+goes to the class of the highest-weight member among the tied ones. A
+member that is not done within its budget of its own run time (queueing
+behind other requests does not count) is left out of that vote. After
+``max_misses`` slow runs in a row its circuit opens for ``cooldown``
+seconds, then a single probe call decides whether it rejoins.
+
+Usage::
+
+    python -m mediguide.ensemble export [--out models] [--drop 0.5]
+    python -m mediguide.ensemble bench [--models models] [--batch 64]
+
+Serve it from the core with ``MEDIGUIDE_ENSEMBLE=models``.
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import numpy as np
+import pandas as pd
+
+
+MANIFEST = "manifest.json"
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_DROP = 0.5
+
+
+def notebook_models():
+    """The notebook's model zoo, minus the SVC that already ships as svc.pkl"""
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.neighbors import KNeighborsClassifier
+
+    return {
+        "random_forest": RandomForestClassifier(n_estimators=100, random_state=42),
+        "gradient_boosting": GradientBoostingClassifier(n_estimators=100, random_state=42),
+        "naive_bayes": MultinomialNB(),
+        "knn": KNeighborsClassifier(n_neighbors=5),
+    }
+
+
+# ---------------------- Ensemble ----------------------
+class EnsembleMember:
+    """One model of the ensemble with its vote weight, latency bookkeeping and circuit breaker.
+
+    After ``max_misses`` runs over budget in a row the circuit opens and the
+    member sits out every vote for ``cooldown`` seconds; then a single call is
+    let through as a probe (half-open) and its run time decides whether the
+    member rejoins or waits another cool-down.
+    """
+
+    __slots__ = ("name", "model", "weight", "budget", "latency", "calls", "misses",
+                 "open_until", "probing", "_lock")
+
+    def __init__(self, name, model, weight=1.0, budget_ms=DEFAULT_BUDGET_MS):
+        self.name = name
+        self.model = model
+        self.weight = weight
+        self.budget = budget_ms / 1e3
+        self.latency = 0.0
+        self.calls = 0
+        self.misses = 0
+        self.open_until = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.open_until is None
+
+    def admit(self, now):
+        """Whether this member takes part in a vote starting at ``now``"""
+        with self._lock:
+            if self.open_until is None:
+                return True
+            if now >= self.open_until and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def finish(self, elapsed, max_misses, cooldown):
+        """Account one completed run by its own run time, whether or not its vote was used"""
+        with self._lock:
+            self.calls += 1
+            self.latency = elapsed if self.calls == 1 else 0.9 * self.latency + 0.1 * elapsed
+            probe, self.probing = self.probing, False
+            if elapsed <= self.budget:
+                self.misses = 0
+                self.open_until = None
+                return
+            self.misses += 1
+            if probe or self.misses >= max_misses:
+                self.open_until = time.perf_counter() + cooldown
+
+    def cancel(self):
+        """A call that never ran: free the half-open probe slot if it held it"""
+        with self._lock:
+            self.probing = False
+
+    def reset(self):
+        with self._lock:
+            self.misses = 0
+            self.open_until = None
+            self.probing = False
+
+
+class _Run:
+    """Start time and result of one member call on the pool"""
+
+    __slots__ = ("started", "future")
+
+    def __init__(self):
+        self.started = None
+        self.future = None
+
+
+def _timed_predict(run, model, X):
+    run.started = time.perf_counter()
+    predictions = model.predict(X)
+    return predictions, time.perf_counter() - run.started
+
+
+class Ensemble:
+    """Weighted-vote ensemble evaluating its members concurrently"""
+
+    def __init__(self, members, max_misses=3, cooldown=5.0, max_workers=None):
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        self.members = members
+        self.max_misses = max_misses
+        self.cooldown = cooldown
+        self.classes_ = np.asarray(members[0].model.classes_)
+        # Tie-break order: highest weight first, manifest order among equals
+        self._priority = sorted(range(len(members)), key=lambda i: -members[i].weight)
+        self._class_index = {int(label): i for i, label in enumerate(self.classes_)}
+        # Room for several overlapping requests, so one slow vote does not queue the next
+        self._pool = ThreadPoolExecutor(max_workers or 4 * len(members), thread_name_prefix="ensemble")
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fallbacks = 0
+
+    @property
+    def active(self):
+        return [member for member in self.members if member.enabled]
+
+    def reset(self):
+        """Close every member's circuit"""
+        for member in self.members:
+            member.reset()
+
+    def _submit(self, member, X):
+        run = _Run()
+        run.future = self._pool.submit(_timed_predict, run, member.model, X)
+
+        def account(future):
+            if future.cancelled():
+                member.cancel()
+            elif future.exception() is None:
+                member.finish(future.result()[1], self.max_misses, self.cooldown)
+
+        run.future.add_done_callback(account)
+        return run
+
+    def _wait(self, member, run, start):
+        """The member's predictions, or None when it is not done within its budget of run time"""
+        while True:
+            # Time spent queued behind other requests does not count against the member
+            started = run.started
+            remaining = member.budget - (time.perf_counter() - (started if started is not None else start))
+            try:
+                return run.future.result(timeout=max(remaining, 0.0))[0]
+            except TimeoutError:
+                if started is None and run.started is not None:
+                    continue  # began running meanwhile: give it its own full budget
+                # Still queued: drop it rather than let stale work pile up behind later requests
+                run.future.cancel()
+                return None
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        start = time.perf_counter()
+        runs = [(i, self._submit(self.members[i], X)) for i in self._priority if self.members[i].admit(start)]
+
+        votes = np.zeros((len(X), len(self.classes_)))
+        rows = np.arange(len(X))
+        ballots = []
+        for i, run in runs:
+            member = self.members[i]
+            predictions = self._wait(member, run, start)
+            if predictions is None:
+                continue  # left out of this vote only; ``finish`` accounts the miss
+            columns = np.fromiter((self._class_index[int(p)] for p in predictions), dtype=np.intp, count=len(X))
+            votes[rows, columns] += member.weight
+            ballots.append(columns)
+
+        with self._lock:
+            self.requests += 1
+            self.fallbacks += not ballots
+        if not ballots:
+            # Nobody made the budget: answer with the first member rather than fail the request
+            return np.asarray(self.members[0].model.predict(X))
+        return self.classes_[self._break_ties(votes, ballots)]
+
+    @staticmethod
+    def _break_ties(votes, ballots):
+        """Winning column per row; ``ballots`` in priority order settle ties between top classes"""
+        rows = np.arange(len(votes))
+        tied = np.isclose(votes, votes.max(axis=1, keepdims=True))
+        winners = np.full(len(votes), -1, dtype=np.intp)
+        for columns in ballots:
+            take = (winners < 0) & tied[rows, columns]
+            winners[take] = columns[take]
+        return winners
+
+    def stats(self):
+        stats = {
+            member.name: {
+                "enabled": member.enabled,
+                "weight": member.weight,
+                "budget_ms": member.budget * 1e3,
+                "latency_ms": member.latency * 1e3,
+                "calls": member.calls,
+                "misses": member.misses,
+            }
+            for member in self.members
+        }
+        with self._lock:
+            stats["requests"], stats["fallbacks"] = self.requests, self.fallbacks
+        return stats
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+def load_ensemble(models_dir, **kwargs):
+    """Build an ``Ensemble`` from a directory written by ``export``"""
+    with open(os.path.join(models_dir, MANIFEST)) as file:
+        manifest = json.load(file)
+    members = []
+    for entry in manifest["members"]:
+        with open(os.path.join(models_dir, entry["file"]), "rb") as file:
+            model = pickle.load(file)
+        members.append(EnsembleMember(
+            entry["name"], model, entry.get("weight", 1.0), entry.get("budget_ms", DEFAULT_BUDGET_MS)
+        ))
+    return Ensemble(members, **kwargs)
+
+
+# ---------------------- Export ----------------------
+def load_training(path):
+    data = pd.read_csv(path)
+    X = data.drop(columns=["prognosis"]).to_numpy(dtype=np.float64)
+    y = pd.factorize(data["prognosis"], sort=True)[0]
+    return X, y
+
+
+def vote_weight(correct, total, n_classes):
+    """Weighted-majority weight ``log((K - 1) p / (1 - p))``; Laplace smoothing keeps p = 1 finite"""
+    accuracy = (correct + 1) / (total + 2)
+    return float(np.log((n_classes - 1) * accuracy / (1 - accuracy)))
+
+
+def export(out_dir, svc_path, training_path, budget_ms=DEFAULT_BUDGET_MS, drop=DEFAULT_DROP):
+    """Retrain the notebook models, pickle them and write the manifest"""
+    from sklearn.model_selection import train_test_split
+
+    X, y = load_training(training_path)
+    # Same split as the notebook
+    x_train, x_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=20)
+    # The same held-out rows with symptoms dropped, as users report them
+    sparse = x_test * (np.random.default_rng(0).random(x_test.shape) >= drop)
+    reported = sparse.any(axis=1)
+    sparse, y_sparse = sparse[reported], y_test[reported]
+    n_classes = len(np.unique(y))
+
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.copyfile(svc_path, os.path.join(out_dir, "svc.pkl"))
+    with open(svc_path, "rb") as file:
+        svc = pickle.load(file)
+
+    entries = []
+    for name, model in [("svc", svc)] + list(notebook_models().items()):
+        if name != "svc":
+            model.fit(x_train, y_train)
+            with open(os.path.join(out_dir, f"{name}.pkl"), "wb") as file:
+                pickle.dump(model, file)
+        accuracy = float((model.predict(x_test) == y_test).mean())
+        correct = int((model.predict(sparse) == y_sparse).sum())
+        entries.append({"name": name, "file": f"{name}.pkl",
+                        "weight": vote_weight(correct, len(y_sparse), n_classes),
+                        "budget_ms": budget_ms, "accuracy": accuracy,
+                        "sparse_accuracy": correct / len(y_sparse)})
+        print(f"{name:20s} accuracy {accuracy:.4f}  with {drop:.0%} dropped {correct / len(y_sparse):.4f}"
+              f"  weight {entries[-1]['weight']:.3f}")
+
+    with open(os.path.join(out_dir, MANIFEST), "w") as file:
+        json.dump({"members": entries}, file, indent=2)
+    return entries
+
+
+# ---------------------- Benchmark ----------------------
+def benchmark(ensemble, svc, X, batch=64, repeat=3):
+    """Rows/second of the ensemble vs the single SVC over ``X`` in ``batch``-sized calls.
+
+    ``members_serial_rows_per_s`` runs the same members one after another, so
+    its gap to ``ensemble_rows_per_s`` is what the thread pool buys.
+    """
+    batches = [X[i:i + batch] for i in range(0, len(X), batch)]
+
+    def throughput(predict):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for chunk in batches:
+                predict(chunk)
+            best = min(best, time.perf_counter() - start)
+        return len(X) / best
+
+    def serial(chunk):
+        for member in ensemble.members:
+            member.model.predict(chunk)
+
+    results = {"svc_rows_per_s": throughput(svc.predict),
+               "ensemble_rows_per_s": throughput(ensemble.predict),
+               "members_serial_rows_per_s": throughput(serial)}
+    for member in ensemble.members:
+        results[f"{member.name}_rows_per_s"] = throughput(member.model.predict)
+    results["agreement_with_svc"] = float((ensemble.predict(X) == svc.predict(X)).mean())
+    return results
+
+
+def main(argv=None):
+    from mediguide import core
+
+    parser = argparse.ArgumentParser(description="Export and benchmark the notebook model ensemble")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export")
+    export_parser.add_argument("--out", default=os.path.join(core.DATA_DIR, "models"))
+    export_parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    export_parser.add_argument("--drop", type=float, default=DEFAULT_DROP,
+                               help="share of held-out symptoms dropped when scoring the vote weights")
+    bench_parser = commands.add_parser("bench")
+    bench_parser.add_argument("--models", default=os.path.join(core.DATA_DIR, "models"))
+    bench_parser.add_argument("--batch", type=int, default=64)
+    bench_parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    training_path = core.resolve_path("Training.csv")
+    if args.command == "export":
+        export(args.out, core.resolve_path("svc.pkl"), training_path, args.budget_ms, args.drop)
+        print(f"exported -> {args.out}")
+        return 0
+
+    X, _ = load_training(training_path)
+    X = X[np.random.default_rng(0).permutation(len(X))[:args.rows]]
+    ensemble = load_ensemble(args.models)
+    svc = next(member.model for member in ensemble.members if member.name == "svc")
+    for name, value in benchmark(ensemble, svc, X, args.batch).items():
+        print(f"{name:32s} {value:12.2f}")
+    print(json.dumps(ensemble.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""Offline evaluation harness for model artifacts.
+
+Scores a model artifact (``svc.pkl``, a quantized or distilled ``.npz``, or
+an ensemble directory) against ``Training.csv`` and any other labeled CSV
+with the same columns, and writes per-disease precision/recall, confusion
+counts and latency stats as JSON. With ``--folds k`` the rows are also split
+into stratified folds that are evaluated in parallel worker processes: a
+scikit-learn estimator is refit on the other folds (cross-validation), any
+other artifact is scored fold by fold as shipped.
+
+Prediction vectors and latency stats are cached under ``--cache-dir`` keyed
+by the SHA-256 of the artifact (and, for a distilled tree, of the
+``svc.pkl`` it falls back to) and of the dataset file, so re-evaluating an
+unchanged model on unchanged data only reads the cache. Latency read from the
+cache is marked ``"cached": true`` with the time it was measured; pass
+``--no-cache`` to measure it on this machine now.
+
+Usage::
+
+    python -m mediguide.evaluate [--model svc.pkl] [--data new.csv ...]
+                                 [--folds 5] [--workers 4] [--out report.json]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+LABEL_COLUMN = "prognosis"
+CACHE_DIR = ".mediguide_cache"
+
+
+# ---------------------- Hashing ----------------------
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file, or of every file in a directory in name order"""
+    digest = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    for item in paths:
+        if os.path.isdir(item):
+            continue
+        digest.update(os.path.basename(item).encode())
+        with open(item, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """``.npy`` prediction vectors and JSON sidecars keyed by artifact and dataset hash"""
+
+    def __init__(self, directory=CACHE_DIR, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def get(self, key):
+        """``(predictions, extra)`` stored under ``key``, or None"""
+        path = self._path(key, ".npy")
+        if not self.enabled or not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        with open(self._path(key, ".json")) as file:
+            return np.load(path), json.load(file)
+
+    def put(self, key, predictions, extra):
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        np.save(self._path(key, ".npy"), predictions)
+        with open(self._path(key, ".json"), "w") as file:
+            json.dump(extra, file)
+
+
+# ---------------------- Data ----------------------
+def load_labeled(path, classes):
+    """Feature matrix and label ids of a labeled CSV, with ids in ``classes`` order.
+
+    Symptom columns are matched by name (spelling variants such as
+    ``'dischromic _patches'`` included) and put in ``symptoms_dict`` order,
+    so a file with its columns in another order is scored correctly.
+    """
+    from mediguide.loadgen import normalize_symptom
+    from mediguide.vocabulary import symptoms_dict
+
+    data = pd.read_csv(path)
+    names = data[LABEL_COLUMN].str.strip()
+    unknown = sorted(set(names) - set(classes))
+    if unknown:
+        raise ValueError(f"{path}: unknown labels {unknown}")
+    y = pd.Categorical(names, categories=classes).codes.astype(np.int64)
+
+    features = data.drop(columns=[LABEL_COLUMN])
+    features.columns = [normalize_symptom(str(column)) for column in features.columns]
+    missing = [name for name in symptoms_dict if name not in features.columns]
+    extra = sorted(set(features.columns) - set(symptoms_dict))
+    duplicated = sorted(set(features.columns[features.columns.duplicated()]))
+    if missing or extra or duplicated:
+        raise ValueError(f"{path}: symptom columns do not match the model: "
+                         f"missing {missing}, unexpected {extra}, duplicated {duplicated}")
+    X = features[list(symptoms_dict)].to_numpy(dtype=np.float64)
+    return X, y
+
+
+def training_classes(path):
+    """Label names in LabelEncoder order, which is how the notebook numbered the model outputs"""
+    return sorted(pd.read_csv(path, usecols=[LABEL_COLUMN])[LABEL_COLUMN].str.strip().unique())
+
+
+# ---------------------- Metrics ----------------------
+def confusion_matrix(y_true, y_pred, n_classes):
+    """Dense confusion counts (true x predicted) from a single ``bincount``"""
+    flat = np.asarray(y_true, dtype=np.int64) * n_classes + np.asarray(y_pred, dtype=np.int64)
+    return np.bincount(flat, minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+
+def per_class_report(confusion, classes):
+    hits = np.diag(confusion).astype(np.float64)
+    predicted = confusion.sum(axis=0)
+    support = confusion.sum(axis=1)
+    precision = np.divide(hits, predicted, out=np.zeros_like(hits), where=predicted > 0)
+    recall = np.divide(hits, support, out=np.zeros_like(hits), where=support > 0)
+    present = support > 0
+    return {
+        "accuracy": float(hits.sum() / max(confusion.sum(), 1)),
+        "macro_precision": float(precision[present].mean()) if present.any() else 0.0,
+        "macro_recall": float(recall[present].mean()) if present.any() else 0.0,
+        "per_disease": {
+            name: {"precision": float(precision[i]), "recall": float(recall[i]), "support": int(support[i])}
+            for i, name in enumerate(classes) if support[i] or predicted[i]
+        },
+        "confusions": [
+            {"true": classes[i], "predicted": classes[j], "count": int(confusion[i, j])}
+            for i, j in zip(*np.nonzero(confusion)) if i != j
+        ],
+    }
+
+
+def latency_stats(model, X, rows=200, batch=256):
+    """Single-row latency percentiles and batch throughput"""
+    sample = X[:rows]
+    timings = np.empty(len(sample))
+    for i in range(len(sample)):
+        start = time.perf_counter()
+        model.predict(sample[i:i + 1])
+        timings[i] = time.perf_counter() - start
+    start = time.perf_counter()
+    for offset in range(0, len(X), batch):
+        model.predict(X[offset:offset + batch])
+    elapsed = time.perf_counter() - start
+    timings *= 1e6
+    return {
+        "single_p50_us": float(np.percentile(timings, 50)) if len(timings) else 0.0,
+        "single_p95_us": float(np.percentile(timings, 95)) if len(timings) else 0.0,
+        "single_p99_us": float(np.percentile(timings, 99)) if len(timings) else 0.0,
+        "batch_rows_per_s": len(X) / elapsed if elapsed else 0.0,
+    }
+
+
+# ---------------------- Evaluation ----------------------
+def score(model, X, y, classes, cache, key, latency_rows):
+    cached = cache.get(key)
+    if cached is None:
+        predictions = np.asarray(model.predict(X), dtype=np.int64)
+        latency = dict(latency_stats(model, X, latency_rows), measured_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        cache.put(key, predictions, latency)
+        latency["cached"] = False
+    else:
+        predictions, latency = cached
+        # Timings of an earlier run, possibly on another machine or under other load
+        latency["cached"] = True
+    report = per_class_report(confusion_matrix(y, predictions, len(classes)), classes)
+    report["rows"] = len(y)
+    report["latency"] = latency
+    return report, predictions
+
+
+def _score_fold(model_path, data_dir, X, y, train, test):
+    """Worker: refit a clone of a sklearn estimator on ``train`` or score the artifact as is"""
+    from mediguide import core
+
+    model = core.load_model(model_path, data_dir)
+    if hasattr(model, "get_params"):
+        from sklearn.base import clone
+
+        model = clone(model).fit(X[train], y[train])
+    return test, np.asarray(model.predict(X[test]), dtype=np.int64)
+
+
+def cross_validate(model_path, data_dir, X, y, classes, folds, workers, cache, key):
+    """Out-of-fold predictions from ``folds`` stratified splits evaluated in parallel"""
+    from sklearn.model_selection import StratifiedKFold
+
+    cached = cache.get(key)
+    if cached is None:
+        splitter = StratifiedKFold(folds, shuffle=True, random_state=0)
+        predictions = np.empty(len(y), dtype=np.int64)
+        fold_ids = np.empty(len(y), dtype=np.int64)
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(_score_fold, model_path, data_dir, X, y, train, test)
+                for train, test in splitter.split(X, y)
+            ]
+            for fold, future in enumerate(futures):
+                test, fold_predictions = future.result()
+                predictions[test] = fold_predictions
+                fold_ids[test] = fold
+        cached = predictions, {"fold_ids": fold_ids.tolist()}
+        cache.put(key, *cached)
+    predictions, extra = cached
+    fold_ids = np.asarray(extra["fold_ids"])
+
+    report = per_class_report(confusion_matrix(y, predictions, len(classes)), classes)
+    accuracies = [float((predictions[fold_ids == f] == y[fold_ids == f]).mean()) for f in range(folds)]
+    report["folds"] = folds
+    report["fold_accuracy"] = accuracies
+    report["fold_accuracy_std"] = float(np.std(accuracies))
+    return report
+
+
+def evaluate(model_path, datasets, folds=0, workers=None, cache_dir=CACHE_DIR, use_cache=True,
+             latency_rows=200, data_dir=None):
+    from mediguide import core
+
+    training_path = core.resolve_path("Training.csv", data_dir)
+    classes = training_classes(training_path)
+    cache = PredictionCache(cache_dir, use_cache)
+    artifact_hash = file_hash(model_path)
+    result = {"model": model_path, "model_sha256": artifact_hash, "datasets": {}}
+    fallback = core.fallback_path(model_path, data_dir)
+    if fallback is not None:
+        # A distilled tree's predictions also depend on the SVC it falls back to
+        result["fallback_sha256"] = file_hash(fallback)
+        artifact_hash = hashlib.sha256((artifact_hash + result["fallback_sha256"]).encode()).hexdigest()
+    model = None
+
+    for path in [training_path] + list(datasets):
+        X, y = load_labeled(path, classes)
+        data_hash = file_hash(path)
+        key = f"{artifact_hash[:16]}-{data_hash[:16]}"
+        if model is None and not (use_cache and os.path.exists(os.path.join(cache_dir, f"{key}.npy"))):
+            model = core.load_model(model_path, data_dir)
+        report, _ = score(model, X, y, classes, cache, key, latency_rows)
+        report["sha256"] = data_hash
+        if folds > 1:
+            report["cross_validation"] = cross_validate(
+                model_path, data_dir, X, y, classes, folds, workers, cache, f"{key}-cv{folds}"
+            )
+        result["datasets"][os.path.basename(path)] = report
+    result["cache"] = {"hits": cache.hits, "misses": cache.misses}
+    return result
+
+
+def main(argv=None):
+    from mediguide import core
+
+    parser = argparse.ArgumentParser(description="Evaluate a model artifact on labeled symptom CSVs")
+    parser.add_argument("--model", default=None,
+                        help="model artifact path, or a name looked up in the data dir (default: the served model)")
+    parser.add_argument("--data", action="append", default=[], help="extra labeled CSV, repeatable")
+    parser.add_argument("--folds", type=int, default=0, help="stratified k-fold evaluation (0 disables)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--latency-rows", type=int, default=200)
+    parser.add_argument("--cache-dir", default=os.path.join(core.DATA_DIR, CACHE_DIR))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--out", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.model and os.path.exists(args.model):
+        model_path = args.model
+    else:
+        model_path = core.resolve_path(args.model or core.ENSEMBLE_DIR or core.MODEL_FILE)
+    result = evaluate(model_path, args.data, args.folds, args.workers, args.cache_dir,
+                      not args.no_cache, args.latency_rows)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w") as file:
+            file.write(text)
+        summary = {name: report["accuracy"] for name, report in result["datasets"].items()}
+        print(f"accuracy {summary}, cache {result['cache']} -> {args.out}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Optional worker pool for prediction and report assembly.
+
+Streamlit runs every session's script in its own thread, so inline sklearn
+prediction and table lookups from many sessions contend for the GIL. A
+``PredictionExecutor`` moves that work to a thread or process pool sized to
+the machine, coalesces identical in-flight symptom sets onto one future, and
+exposes queue-depth counters for monitoring.
+
+Enable it in the front-ends with ``MEDIGUIDE_EXECUTOR=thread`` or
+``MEDIGUIDE_EXECUTOR=process`` (``MEDIGUIDE_WORKERS`` overrides the size).
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from mediguide import core
+
+
+# ---------------------- Worker Functions ----------------------
+def _warm_up():
+    """Load the model and catalog once per worker process"""
+    core.get_model()
+    core.get_catalog()
+
+
+def _recommend_key(key):
+    return core.get_report(core.predict_key(key))
+
+
+# ---------------------- Executor ----------------------
+class PredictionExecutor:
+    """Thread or process pool running ``core`` predictions with request coalescing"""
+
+    def __init__(self, kind="thread", max_workers=None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if kind == "process":
+            # Forking while loader threads hold the import lock would deadlock the workers
+            core.wait_ready()
+            self._pool = ProcessPoolExecutor(self.max_workers, initializer=_warm_up)
+        else:
+            _warm_up()
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="mediguide")
+
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+
+    def submit_key(self, key):
+        """Future resolving to the ``Report`` of a bit-packed symptom key"""
+        with self._lock:
+            self.submitted += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._pool.submit(_recommend_key, key)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda _, key=key: self._finish(key))
+        return future
+
+    def submit(self, symptoms):
+        return self.submit_key(core.encode_key(symptoms))
+
+    def recommend(self, symptoms, timeout=None):
+        """Blocking convenience wrapper around ``submit``"""
+        return self.submit(symptoms).result(timeout)
+
+    def _finish(self, key):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self.completed += 1
+
+    @property
+    def queue_depth(self):
+        """Distinct computations submitted but not finished yet"""
+        return len(self._in_flight)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.max_workers,
+                "queue_depth": len(self._in_flight),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+            }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+def from_env():
+    """Executor configured by ``MEDIGUIDE_EXECUTOR`` / ``MEDIGUIDE_WORKERS``, or None"""
+    kind = os.environ.get("MEDIGUIDE_EXECUTOR", "").strip().lower()
+    if kind in ("", "none", "inline"):
+        return None
+    workers = os.environ.get("MEDIGUIDE_WORKERS")
+    return PredictionExecutor(kind, int(workers) if workers else None)
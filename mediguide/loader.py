@@ -0,0 +1,174 @@
+"""Concurrent startup loading of the model and data files.
+
+Cold start used to read ``svc.pkl`` and the CSVs one after another, which is
+dominated by I/O latency when they live on a network volume. ``AssetLoader``
+reads every asset on its own thread, verifies its SHA-256 against
+``checksums.json`` when that file lists it, and parses it from the bytes
+already in memory. Front-ends start it without waiting, render what needs no
+data (the symptom picker) immediately and block in ``result`` only when the
+first prediction needs an asset.
+
+``python -m mediguide.loader --write`` records the checksums of the current
+assets; without ``--write`` it compares serial and concurrent load times
+(``--delay-ms`` adds a per-file read delay to mimic a slow volume).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+CHECKSUM_FILE = "checksums.json"
+
+
+class ChecksumError(ValueError):
+    """An asset does not match the digest recorded in ``checksums.json``"""
+
+
+def read_bytes(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def load_checksums(data_dir):
+    """Recorded digests by file name, or an empty dict when none were written"""
+    path = os.path.join(data_dir, CHECKSUM_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+class AssetLoader:
+    """Loads named assets concurrently and reports when they are ready.
+
+    ``assets`` maps a name to ``(path, parse)``; ``parse(data, path)`` gets
+    the file's bytes (None for directories) and returns the loaded object.
+    """
+
+    def __init__(self, assets, checksums=None, max_workers=None, read=read_bytes):
+        self.checksums = checksums or {}
+        self.read = read
+        self.timings = {}
+        self.digests = {}
+        self._lock = threading.Lock()
+        self._derive_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers or len(assets), thread_name_prefix="mediguide-load")
+        self._futures = {
+            name: self._pool.submit(self._load, name, path, parse)
+            for name, (path, parse) in assets.items()
+        }
+        self._pool.shutdown(wait=False)
+
+    def _load(self, name, path, parse):
+        start = time.perf_counter()
+        data = None
+        if not os.path.isdir(path):
+            data = self.read(path)
+            digest = hashlib.sha256(data).hexdigest()
+            expected = self.checksums.get(os.path.basename(path))
+            if expected is not None and expected != digest:
+                raise ChecksumError(f"{path}: sha256 {digest} does not match recorded {expected}")
+            with self._lock:
+                self.digests[os.path.basename(path)] = digest
+        value = parse(data, path)
+        with self._lock:
+            self.timings[name] = time.perf_counter() - start
+        return value
+
+    def _snapshot(self):
+        # Sessions read the futures while ``derive`` swaps sources for results
+        with self._lock:
+            return dict(self._futures)
+
+    def _future(self, name):
+        with self._lock:
+            return self._futures[name]
+
+    @property
+    def ready(self):
+        """True once every asset has finished loading (successfully or not, see ``errors``)"""
+        return all(future.done() for future in self._snapshot().values())
+
+    def is_ready(self, name):
+        """True once ``name`` has finished loading, successfully or not"""
+        with self._lock:
+            future = self._futures.get(name)
+        return future is None or future.done()
+
+    def pending(self):
+        return [name for name, future in self._snapshot().items() if not future.done()]
+
+    def errors(self):
+        """Exceptions of the assets that failed to load, by name"""
+        return {
+            name: future.exception()
+            for name, future in self._snapshot().items()
+            if future.done() and future.exception() is not None
+        }
+
+    def result(self, name, timeout=None):
+        """The loaded asset, blocking until it is available; re-raises load errors"""
+        return self._future(name).result(timeout)
+
+    def derive(self, name, build, sources):
+        """Asset ``name`` built once by ``build(*sources)``; the sources are dropped afterwards"""
+        with self._derive_lock:
+            with self._lock:
+                future = self._futures.get(name)
+            if future is None:
+                future = Future()
+                future.set_result(build(*(self.result(source) for source in sources)))
+                with self._lock:
+                    self._futures[name] = future
+                    # The derived asset holds everything its sources had; keeping both doubles the footprint
+                    for source in sources:
+                        self._futures.pop(source, None)
+        return future.result()
+
+    def wait(self, timeout=None):
+        for future in self._snapshot().values():
+            future.result(timeout)
+        return self
+
+
+def main(argv=None):
+    from mediguide import core
+
+    parser = argparse.ArgumentParser(description="Record asset checksums or time concurrent loading")
+    parser.add_argument("--write", action="store_true", help=f"write {CHECKSUM_FILE} for the current assets")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="artificial per-file read delay")
+    args = parser.parse_args(argv)
+
+    if args.write:
+        loader = core.start_loading(checksums={}).wait()
+        path = os.path.join(core.DATA_DIR, CHECKSUM_FILE)
+        with open(path, "w") as file:
+            json.dump(dict(sorted(loader.digests.items())), file, indent=2)
+        print(f"{len(loader.digests)} checksums -> {path}")
+        return 0
+
+    def slow_read(path):
+        time.sleep(args.delay_ms / 1e3)
+        return read_bytes(path)
+
+    core.start_loading(install=False).wait()  # warm imports so both runs time only the loading
+    results = {}
+    for label, workers in (("serial", 1), ("concurrent", None)):
+        start = time.perf_counter()
+        loader = core.start_loading(max_workers=workers, read=slow_read, install=False)
+        ready_at = time.perf_counter() - start
+        loader.wait()
+        results[f"{label}_start_ms"] = ready_at * 1e3
+        results[f"{label}_total_ms"] = (time.perf_counter() - start) * 1e3
+    for name, value in results.items():
+        print(f"{name:24s} {value:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
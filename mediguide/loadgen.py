@@ -0,0 +1,315 @@
+"""Load generator replaying realistic symptom traffic.
+
+``SymptomDistribution`` learns how often each symptom combination occurs
+from ``symptoms_df.csv`` and, optionally, from a recorded audit log
+(``mediguide.audit``). ``--drop`` additionally leaves symptoms out at random,
+since real users rarely report a textbook set. The generator samples
+requests from that distribution and drives one of three targets:
+
+* ``core``     -- ``core.predict_key`` + ``core.get_report`` in this process
+* ``executor`` -- a ``PredictionExecutor`` (``--executor-kind thread|process``)
+* ``app``      -- ``app.py`` end to end through Streamlit's ``AppTest``
+  script runner, one simulated browser session per worker, each in its own
+  process because ``AppTest`` is not thread-safe
+
+``--concurrency`` workers either run closed-loop (``--rate 0``) or together
+issue ``--rate`` requests per second open-loop. The report covers
+throughput and latency percentiles of the successful requests, the number
+of failed ones, prediction/report cache hit rates (for the targets that
+share this process's caches) and the memory growth of this process. It
+exits non-zero when any request failed. Everything runs locally::
+
+    python -m mediguide.loadgen [--target core] [--requests 20000]
+                                [--concurrency 8] [--rate 0] [--drop 0.2]
+                                [--audit audit/] [--json]
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from mediguide import core
+from mediguide.session_store import symptom_indices, symptom_key
+from mediguide.vocabulary import symptom_names, symptoms_dict
+
+
+# ---------------------- Distribution ----------------------
+def normalize_symptom(name):
+    """``symptoms_df.csv`` spelling (``'dischromic _patches'``) -> vocabulary name"""
+    return re.sub(r"[\s_]+", "_", name.strip())
+
+
+class SymptomDistribution:
+    """Empirical distribution over bit-packed symptom keys"""
+
+    def __init__(self, counts):
+        counts = {key: n for key, n in counts.items() if key and n > 0}
+        if not counts:
+            raise ValueError("Empty symptom distribution")
+        self.keys = list(counts)
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        self.probabilities = weights / weights.sum()
+
+    @classmethod
+    def from_symptoms_df(cls, path):
+        data = pd.read_csv(path)
+        columns = [column for column in data.columns if column.startswith("Symptom")]
+        counts = collections.Counter()
+        for row in data[columns].itertuples(index=False):
+            indices = [symptoms_dict[normalize_symptom(v)] for v in row if isinstance(v, str) and v.strip()]
+            counts[symptom_key(indices)] += 1
+        return cls(counts)
+
+    @classmethod
+    def from_audit(cls, log_dir):
+        from mediguide import audit
+
+        counts = collections.Counter()
+        for records in audit.read_records(log_dir):
+            counts.update(audit.symptom_keys(records))
+        return cls(counts)
+
+    def mix(self, other, weight=0.5):
+        """Blend with ``other``, giving it ``weight`` of the probability mass"""
+        counts = collections.Counter()
+        for source, share in ((self, 1 - weight), (other, weight)):
+            for key, p in zip(source.keys, source.probabilities):
+                counts[key] += share * p
+        return SymptomDistribution(counts)
+
+    def sample(self, n, rng, drop=0.0):
+        """``n`` symptom keys; with ``drop`` each symptom is left out with that probability"""
+        picks = rng.choice(len(self.keys), size=n, p=self.probabilities)
+        keys = [self.keys[i] for i in picks]
+        if drop <= 0:
+            return keys
+        sampled = []
+        for key in keys:
+            kept = [i for i in symptom_indices(key) if rng.random() >= drop]
+            sampled.append(symptom_key(kept) or key)
+        return sampled
+
+    def __len__(self):
+        return len(self.keys)
+
+
+# ---------------------- Targets ----------------------
+# A target is ``(send, close, counters)``; ``counters`` is None when the
+# caches live in other processes and hit rates cannot be observed from here
+def core_target():
+    core.get_model()
+    core.get_catalog()
+
+    def send(key):
+        core.get_report(core.predict_key(key))
+
+    return send, lambda: None, cache_counters
+
+
+def executor_target(kind):
+    from mediguide.executor import PredictionExecutor
+
+    pool = PredictionExecutor(kind)
+
+    def send(key):
+        pool.submit_key(key).result()
+
+    return send, pool.shutdown, cache_counters if kind == "thread" else None
+
+
+def _app_session(app_path, connection):
+    """Process body of one simulated browser session: symptom keys in, error messages (or None) out"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(app_path, default_timeout=60)
+    app.run()
+    for key in iter(connection.recv, None):
+        try:
+            app.multiselect(key="symptom_selector").set_value([symptom_names[i] for i in symptom_indices(key)])
+            app.button(key="analyze").click().run()
+            connection.send(app.exception[0].message if app.exception else None)
+        except Exception as error:
+            connection.send(repr(error))
+    connection.close()
+
+
+def app_target(app_path):
+    """One ``AppTest`` session process per worker thread driving the symptom-search form"""
+    # AppTest drives the script runner from the calling thread and is not safe to share a process between
+    # threads; spawn, not fork, so no session inherits the driver's threads
+    context = multiprocessing.get_context("spawn")
+    local = threading.local()
+    sessions = []
+    lock = threading.Lock()
+
+    def send(key):
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection, child = context.Pipe()
+            process = context.Process(target=_app_session, args=(app_path, child), daemon=True)
+            process.start()
+            child.close()
+            local.connection = connection
+            with lock:
+                sessions.append((process, connection))
+        connection.send(key)
+        error = connection.recv()
+        if error is not None:
+            raise RuntimeError(error)
+
+    def close():
+        for process, connection in sessions:
+            try:
+                connection.send(None)
+            except OSError:  # the session already died; its requests were counted as errors
+                pass
+            process.join()
+
+    return send, close, None
+
+
+# ---------------------- Measurement ----------------------
+def rss_bytes():
+    """Current resident set size, or the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def cache_counters():
+    counters = {}
+    for name, func in (("predict", core.predict_key), ("report", core.get_report)):
+        info = func.cache_info()
+        counters[name] = (info.hits, info.misses)
+    return counters
+
+
+def run(send, keys, concurrency=8, rate=0.0):
+    """Issue ``keys`` from ``concurrency`` workers; returns per-request latencies and success flags"""
+    latencies = np.zeros(len(keys))
+    succeeded = np.zeros(len(keys), dtype=bool)
+    errors = []
+    memory = [rss_bytes()]
+    done = threading.Event()
+
+    def sample_memory():
+        while not done.wait(0.1):
+            memory.append(rss_bytes())
+
+    def worker(offset):
+        interval = concurrency / rate if rate > 0 else 0.0
+        next_at = start + offset * (interval / concurrency if interval else 0.0)
+        for i in range(offset, len(keys), concurrency):
+            if interval:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at += interval
+            begin = time.perf_counter()
+            try:
+                send(keys[i])
+                succeeded[i] = True
+            except Exception as error:  # keep the run going and report failures at the end
+                errors.append(repr(error))
+            latencies[i] = time.perf_counter() - begin
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    sampler.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    memory.append(rss_bytes())
+    return latencies[succeeded], elapsed, errors, memory
+
+
+def report(latencies, elapsed, errors, memory, before, after, distinct):
+    """Summary of a run; ``latencies`` are those of the successful requests only"""
+    # Failures usually return early and would flatter the percentiles
+    micros = latencies * 1e6 if len(latencies) else np.full(1, np.nan)
+    results = {
+        "requests": len(latencies) + len(errors),
+        "distinct_keys": distinct,
+        "errors": len(errors),
+        "throughput_per_s": len(latencies) / elapsed,
+        "latency_p50_us": float(np.percentile(micros, 50)),
+        "latency_p90_us": float(np.percentile(micros, 90)),
+        "latency_p99_us": float(np.percentile(micros, 99)),
+        "latency_max_us": float(micros.max()),
+        "rss_start_mb": memory[0] / 2**20,
+        "rss_peak_mb": max(memory) / 2**20,
+        "rss_growth_mb": (memory[-1] - memory[0]) / 2**20,
+    }
+    for name in before or ():
+        hits = after[name][0] - before[name][0]
+        misses = after[name][1] - before[name][1]
+        results[f"{name}_cache_hit_rate"] = hits / (hits + misses) if hits + misses else 0.0
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate realistic prediction load")
+    parser.add_argument("--target", choices=("core", "executor", "app"), default="core")
+    parser.add_argument("--executor-kind", choices=("thread", "process"), default="thread")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0.0, help="total requests/s, 0 = as fast as possible")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability of leaving out each symptom")
+    parser.add_argument("--audit", default=None, help="audit log directory to learn recorded traffic from")
+    parser.add_argument("--audit-weight", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    distribution = SymptomDistribution.from_symptoms_df(core.resolve_path("symptoms_df.csv"))
+    if args.audit:
+        distribution = distribution.mix(SymptomDistribution.from_audit(args.audit), args.audit_weight)
+    keys = distribution.sample(args.requests, np.random.default_rng(args.seed), args.drop)
+
+    if args.target == "core":
+        send, close, counters = core_target()
+    elif args.target == "executor":
+        send, close, counters = executor_target(args.executor_kind)
+    else:
+        send, close, counters = app_target(os.path.join(core.DATA_DIR, "app.py"))
+
+    before = counters() if counters else None
+    latencies, elapsed, errors, memory = run(send, keys, args.concurrency, args.rate)
+    after = counters() if counters else None
+    close()
+
+    results = report(latencies, elapsed, errors, memory, before, after, len(set(keys)))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{len(distribution)} symptom combinations learned, target {args.target}")
+        for name, value in results.items():
+            print(f"{name:24s} {value:12.2f}")
+        if counters is None:
+            print("cache hit rates: n/a, the caches live in worker processes")
+    if errors:
+        print(f"{len(errors)} requests failed, first error: {errors[0]}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
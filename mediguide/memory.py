@@ -0,0 +1,119 @@
+"""Per-asset memory report and footprint check.
+
+Usage::
+
+    python -m mediguide.memory [--max-rss-mb 400] [--max-assets-mb 8]
+
+Loads everything a front-end keeps resident through ``core`` (the same
+background loader the apps use) and prints the deep size of every asset,
+how large the raw recommendation and training DataFrames would be next to
+their ``compact_table`` form, and the process RSS before and after loading.
+It exits non-zero when the footprint exceeds ``MAX_RSS_MB`` /
+``MAX_ASSETS_MB`` (or the bounds given on the command line, 0 disables
+one), so it can gate a deployment that packs many app replicas on one node.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# Budget of one app replica; a plain run enforces it
+MAX_RSS_MB = 400
+MAX_ASSETS_MB = 8
+
+
+def deep_sizeof(obj, seen=None):
+    """Bytes reachable from ``obj``: NumPy buffers, DataFrames and plain containers, each counted once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        # getsizeof includes the data only for arrays that own it; unpickled arrays wrap a bytes
+        # buffer, views of another array share that array's buffer
+        if obj.base is None or isinstance(obj.base, np.ndarray):
+            return sys.getsizeof(obj)
+        return sys.getsizeof(obj) + obj.nbytes
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def asset_sizes():
+    """Deep size of every resident asset of the shared core"""
+    from mediguide import core
+
+    return {
+        "model": deep_sizeof(core.get_model()),
+        "catalog": deep_sizeof(core.get_catalog()),
+        "questionnaire_stats": deep_sizeof(core.get_questionnaire_stats()),
+        "cooccurrence": deep_sizeof(core.get_cooccurrence()),
+    }
+
+
+def table_sizes():
+    """``(raw, compact)`` DataFrame bytes of every CSV the apps read"""
+    from mediguide import core
+    from mediguide.catalog import TABLE_FILES, compact_table
+
+    sizes = {}
+    for name in list(TABLE_FILES.values()) + ["Training.csv"]:
+        raw = pd.read_csv(core.resolve_path(name))
+        sizes[name] = (deep_sizeof(raw), deep_sizeof(compact_table(raw)))
+    return sizes
+
+
+def main(argv=None):
+    from mediguide import core
+    from mediguide.loadgen import rss_bytes
+
+    parser = argparse.ArgumentParser(description="Report resident bytes per asset and check the footprint")
+    parser.add_argument("--max-rss-mb", type=float, default=MAX_RSS_MB,
+                        help=f"fail if process RSS exceeds this (default {MAX_RSS_MB}, 0 = no bound)")
+    parser.add_argument("--max-assets-mb", type=float, default=MAX_ASSETS_MB,
+                        help=f"fail if the loaded assets exceed this (default {MAX_ASSETS_MB}, 0 = no bound)")
+    args = parser.parse_args(argv)
+
+    baseline = rss_bytes()
+    core.start_loading().wait()
+    assets = asset_sizes()
+    loaded = rss_bytes()
+
+    print("resident assets")
+    for name, size in assets.items():
+        print(f"  {name:24s} {size:>12,d} bytes")
+    total = sum(assets.values())
+    print(f"  {'total':24s} {total:>12,d} bytes")
+
+    print("tables (raw DataFrame -> compact_table)")
+    for name, (raw, compact) in table_sizes().items():
+        print(f"  {name:24s} {raw:>12,d} -> {compact:>10,d} bytes")
+
+    print(f"process rss: {baseline / 2**20:.1f} MB after imports, {loaded / 2**20:.1f} MB loaded")
+
+    failures = []
+    if args.max_rss_mb and loaded > args.max_rss_mb * 2**20:
+        failures.append(f"rss {loaded / 2**20:.1f} MB exceeds {args.max_rss_mb} MB")
+    if args.max_assets_mb and total > args.max_assets_mb * 2**20:
+        failures.append(f"assets {total / 2**20:.2f} MB exceed {args.max_assets_mb} MB")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Integer-quantized export of the linear one-vs-one SVC.
+
+``svc.pkl`` holds 820 pairwise linear classifiers over 132 binary symptom
+features as float64 (plus support vectors that are only needed for
+training). Because the inputs are 0/1, each pairwise decision is just the
+sum of the weights of the present symptoms plus a bias. ``quantize`` stores
+those weights feature-major as int8 or int16 with one float scale per
+classifier and the bias pre-scaled to int32, and ``QuantizedSVC`` scores by
+summing the weight rows of the present symptoms in int32 and voting with
+the same rule as libsvm. Only NumPy is needed to load and serve the
+exported ``.npz``; point ``MEDIGUIDE_MODEL`` at it to serve it from the core.
+
+Usage::
+
+    python -m mediguide.quantize [--bits 8] [--out svc_int8.npz]
+
+The export is verified to reproduce ``model.predict`` on every
+``Training.csv`` row and is refused otherwise. Agreement on nearby inputs
+(training patterns with one symptom removed) is reported as well; those can
+differ where two classes are tied to within the quantization step.
+"""
+import argparse
+import itertools
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+DTYPES = {8: np.int8, 16: np.int16}
+
+
+# ---------------------- Scorer ----------------------
+class QuantizedSVC:
+    """One-vs-one linear SVC with integer weights and integer accumulation"""
+
+    def __init__(self, weights, bias, scales, classes):
+        # weights are (n_features, n_classifiers) so a symptom's weights are one contiguous row
+        self.weights = np.ascontiguousarray(weights)
+        self.bias = bias
+        self.scales = scales
+        self.classes_ = classes
+        self.n_features_in_ = weights.shape[0]
+
+        n_classes = len(classes)
+        pairs = np.array(list(itertools.combinations(range(n_classes), 2)), dtype=np.int32)
+        if len(pairs) != weights.shape[1]:
+            raise ValueError(f"{weights.shape[1]} classifiers do not match {n_classes} classes")
+        self._first, self._second = pairs[:, 0], pairs[:, 1]
+
+    @property
+    def bits(self):
+        return self.weights.dtype.itemsize * 8
+
+    def accumulate(self, X):
+        """Integer pairwise decision values (n, n_classifiers) for binary inputs"""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        acc = np.empty((len(X), self.weights.shape[1]), dtype=np.int32)
+        # Inputs are sparse and binary: gathering rows beats an integer matmul (which has no BLAS path)
+        for row, present in enumerate(X != 0):
+            self.weights[present].sum(axis=0, dtype=np.int32, out=acc[row])
+        acc += self.bias
+        return acc
+
+    def decision_function(self, X):
+        """Pairwise decision values rescaled to floats (``decision_function_shape='ovo'``)"""
+        return self.accumulate(X) * self.scales
+
+    def predict(self, X):
+        acc = self.accumulate(X)
+        n, n_classes = len(acc), len(self.classes_)
+        # libsvm: positive decision votes for the first class of the pair, otherwise the second
+        winners = np.where(acc > 0, self._first, self._second)
+        winners += (np.arange(n, dtype=np.int32) * n_classes)[:, None]
+        votes = np.bincount(winners.ravel(), minlength=n * n_classes).reshape(n, n_classes)
+        return self.classes_[votes.argmax(axis=1)]
+
+    @property
+    def nbytes(self):
+        return self.weights.nbytes + self.bias.nbytes + self.scales.nbytes + self.classes_.nbytes
+
+    # ---------------------- Persistence ----------------------
+    def save(self, path):
+        np.savez(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            scales=self.scales,
+            classes=self.classes_,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], data["scales"], data["classes"])
+
+
+def quantize(model, bits=8):
+    """Quantize a fitted linear-kernel ``SVC`` into a ``QuantizedSVC``"""
+    if bits not in DTYPES:
+        raise ValueError(f"Unsupported bit width {bits}, choose from {sorted(DTYPES)}")
+    if getattr(model, "kernel", None) != "linear":
+        raise ValueError("Only linear-kernel SVC models can be quantized")
+
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    qmax = np.iinfo(DTYPES[bits]).max
+
+    # One scale per pairwise classifier, covering both weights and bias
+    magnitude = np.maximum(np.abs(coef).max(axis=1), np.abs(intercept))
+    scales = np.where(magnitude > 0, magnitude / qmax, 1.0)
+
+    weights = np.rint(coef / scales[:, None]).astype(DTYPES[bits]).T
+    bias = np.rint(intercept / scales).astype(np.int32)
+    return QuantizedSVC(weights, bias, scales.astype(np.float32), np.asarray(model.classes_))
+
+
+def verify(quantized, model, X):
+    """Indices of rows where the quantized and original predictions differ"""
+    return np.flatnonzero(quantized.predict(X) != model.predict(X))
+
+
+def neighbours(X):
+    """Distinct rows of ``X`` with one present feature switched off"""
+    rows = []
+    for row in np.unique(X, axis=0):
+        for feature in np.flatnonzero(row):
+            neighbour = row.copy()
+            neighbour[feature] = 0
+            rows.append(neighbour)
+    return np.unique(np.array(rows), axis=0)
+
+
+# ---------------------- CLI ----------------------
+def main(argv=None):
+    from mediguide import core
+
+    parser = argparse.ArgumentParser(description="Export svc.pkl as an integer-quantized model")
+    parser.add_argument("--bits", type=int, choices=sorted(DTYPES), default=8)
+    parser.add_argument("--model", default=None, help="pickled SVC (default: svc.pkl)")
+    parser.add_argument("--data", default=None, help="labeled CSV used for verification (default: Training.csv)")
+    parser.add_argument("--out", default=None, help="output .npz (default: svc_int<bits>.npz)")
+    args = parser.parse_args(argv)
+
+    model_path = args.model or core.resolve_path("svc.pkl")
+    with open(model_path, "rb") as file:
+        model = pickle.load(file)
+
+    data = pd.read_csv(args.data or core.resolve_path("Training.csv"))
+    X = data.drop(columns=["prognosis"]).to_numpy(dtype=np.float64)
+
+    quantized = quantize(model, args.bits)
+    mismatches = verify(quantized, model, X)
+    print(f"verified on {len(X)} rows: {len(mismatches)} mismatches")
+    if len(mismatches):
+        print(f"int{args.bits} export changes predictions, try --bits 16", file=sys.stderr)
+        return 1
+
+    nearby = neighbours(X)
+    agreement = 1 - len(verify(quantized, model, nearby)) / len(nearby)
+    print(f"agreement on {len(nearby)} nearby inputs: {agreement:.2%}")
+
+    out = args.out or os.path.join(os.path.dirname(model_path), f"svc_int{args.bits}.npz")
+    quantized.save(out)
+    print(f"original weights: {model.coef_.nbytes:,} bytes, pickle: {os.path.getsize(model_path):,} bytes")
+    print(f"int{args.bits} model:     {quantized.nbytes:,} bytes, file: {os.path.getsize(out):,} bytes -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
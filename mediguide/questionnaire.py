@@ -0,0 +1,140 @@
+"""Adaptive symptom questionnaire.
+
+Instead of presenting all 132 symptoms at once, the questionnaire asks about
+one symptom at a time, always choosing the symptom whose answer is expected
+to remove the most uncertainty about the disease (information gain). The
+per-disease symptom frequencies come from ``Training.csv`` and are turned
+into dense matrices once, so scoring every remaining question is a couple of
+vectorized NumPy reductions over a 41 x 132 array.
+"""
+import numpy as np
+import pandas as pd
+
+
+# ---------------------- Statistics ----------------------
+class SymptomStatistics:
+    """Precomputed class/symptom count matrices used to score questions"""
+
+    __slots__ = ("classes", "prior", "likelihood", "log_yes", "log_no")
+
+    def __init__(self, classes, class_counts, symptom_counts, alpha=1.0):
+        self.classes = np.asarray(classes)
+        class_counts = np.asarray(class_counts, dtype=np.float64)
+        symptom_counts = np.asarray(symptom_counts, dtype=np.float64)
+
+        self.prior = class_counts / class_counts.sum()
+        # Laplace smoothing keeps a single unexpected answer from ruling a disease out
+        self.likelihood = (symptom_counts + alpha) / (class_counts[:, None] + 2 * alpha)
+        self.log_yes = np.log(self.likelihood)
+        self.log_no = np.log1p(-self.likelihood)
+
+    @property
+    def n_symptoms(self):
+        return self.likelihood.shape[1]
+
+
+def build_statistics(training, label_column="prognosis", alpha=1.0):
+    """Build the count matrices from the training DataFrame.
+
+    Classes are ordered the same way ``LabelEncoder`` orders them, so the
+    row index of each class matches the label id predicted by ``svc.pkl``.
+    """
+    features = training.drop(columns=[label_column]).to_numpy(dtype=np.int64)
+    labels, classes = pd.factorize(training[label_column], sort=True)
+
+    n_classes = len(classes)
+    class_counts = np.bincount(labels, minlength=n_classes)
+    symptom_counts = np.zeros((n_classes, features.shape[1]), dtype=np.int64)
+    np.add.at(symptom_counts, labels, features)
+
+    return SymptomStatistics(np.arange(n_classes), class_counts, symptom_counts, alpha=alpha)
+
+
+def load_statistics(path="Training.csv", alpha=1.0):
+    """Read ``Training.csv`` and precompute the questionnaire statistics"""
+    return build_statistics(pd.read_csv(path), alpha=alpha)
+
+
+# ---------------------- Scoring ----------------------
+def _xlogx(values):
+    """Elementwise x * log(x) with the 0 * log(0) = 0 convention"""
+    out = np.zeros_like(values)
+    np.multiply(values, np.log(values, out=np.zeros_like(values), where=values > 0),
+                out=out, where=values > 0)
+    return out
+
+
+def entropy(p):
+    """Shannon entropy (nats) of a probability vector"""
+    return -_xlogx(p).sum()
+
+
+def information_gain(posterior, likelihood):
+    """Expected entropy reduction for asking each symptom.
+
+    ``posterior`` is the current (D,) disease distribution and ``likelihood``
+    the (D, S) matrix of P(symptom | disease). Returns an (S,) array.
+    """
+    joint_yes = posterior[:, None] * likelihood
+    joint_no = posterior[:, None] - joint_yes
+    p_yes = joint_yes.sum(axis=0)
+    p_no = 1.0 - p_yes
+
+    # sum_d j log(j / p) = sum_d j log j - p log p
+    expected = -(_xlogx(joint_yes).sum(axis=0) - _xlogx(p_yes)) \
+               - (_xlogx(joint_no).sum(axis=0) - _xlogx(p_no))
+    return entropy(posterior) - expected
+
+
+# ---------------------- Questionnaire ----------------------
+class Questionnaire:
+    """Tracks the answers of one intake session and picks the next question"""
+
+    def __init__(self, stats, confidence=0.95, max_questions=20, min_gain=1e-4):
+        self.stats = stats
+        self.confidence = confidence
+        self.max_questions = max_questions
+        self.min_gain = min_gain
+        self.answers = {}
+        self._log_posterior = np.log(stats.prior)
+        self._asked = np.zeros(stats.n_symptoms, dtype=bool)
+
+    def answer(self, symptom, value):
+        """Record an answer: True (yes), False (no) or None (not sure)"""
+        if self._asked[symptom]:
+            return
+        self._asked[symptom] = True
+        self.answers[symptom] = value
+        if value is True:
+            self._log_posterior = self._log_posterior + self.stats.log_yes[:, symptom]
+        elif value is False:
+            self._log_posterior = self._log_posterior + self.stats.log_no[:, symptom]
+
+    def posterior(self):
+        shifted = np.exp(self._log_posterior - self._log_posterior.max())
+        return shifted / shifted.sum()
+
+    def leading(self):
+        """Return ``(class_id, probability)`` of the most likely disease"""
+        posterior = self.posterior()
+        best = int(posterior.argmax())
+        return int(self.stats.classes[best]), float(posterior[best])
+
+    def next_question(self):
+        """Index of the most informative unasked symptom, or None when finished"""
+        if self.finished:
+            return None
+        scores = information_gain(self.posterior(), self.stats.likelihood)
+        scores[self._asked] = -np.inf
+        best = int(scores.argmax())
+        return best if scores[best] > self.min_gain else None
+
+    @property
+    def positive_symptoms(self):
+        return [symptom for symptom, value in self.answers.items() if value is True]
+
+    @property
+    def finished(self):
+        if len(self.answers) >= self.max_questions or self._asked.all():
+            return True
+        return self.leading()[1] >= self.confidence
@@ -0,0 +1,288 @@
+"""Several versioned model + recommendation-table bundles in one process.
+
+A registry file lists the bundles and how requests are routed to them::
+
+    {
+      "default": "v1",
+      "versions": {
+        "v1": {"model": "svc.pkl"},
+        "v2": {"model": "models/svc_retrained.pkl"},
+        "de": {"model": "svc.pkl", "tables": {"diets": "de/diets.csv", "medications": "de/medications.csv"}}
+      },
+      "tenants": {"clinic-berlin": "de"},
+      "experiments": {"retrain": {"v1": 0.5, "v2": 0.5}}
+    }
+
+Paths are relative to the registry file (or found like ``core.resolve_path``)
+and tables a version does not override come from the default CSVs. Files
+are deduplicated by SHA-256: identical models, tables and whole catalogs are
+loaded once and shared between versions. ``route`` picks a tenant's version
+first, then a stable experiment arm for a unit key (e.g. the session id),
+then the default. Every version counts requests, prediction cache hits,
+the latency of its model (timed on cache misses) and predicted diseases so
+versions can be compared in one deployment.
+
+Serve it from ``app.py`` with ``MEDIGUIDE_REGISTRY=registry.json`` and
+``?tenant=`` / ``?experiment=`` query parameters, or compare the versions
+offline with ``python -m mediguide.registry registry.json``.
+"""
+import argparse
+import collections
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from mediguide import core
+from mediguide.catalog import SECTIONS, TABLE_FILES, build_catalog, compact_table
+from mediguide.evaluate import file_hash
+from mediguide.loader import read_bytes
+from mediguide.vocabulary import disease_aliases, diseases_list
+
+
+# ---------------------- Shared Content ----------------------
+class ContentStore:
+    """Parsed files and derived objects shared by SHA-256 of their content"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects = {}
+        self.loads = 0
+        self.shared = 0
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._objects:
+                self.shared += 1
+                return self._objects[key]
+        value = build()
+        with self._lock:
+            self.loads += 1
+            return self._objects.setdefault(key, value)
+
+    def file(self, path, parse):
+        """``(sha256, parse(data, path))`` of a file or directory, parsed once per distinct content"""
+        if os.path.isdir(path):
+            # Ensemble model directories: hash every member file, let the parser load from the path
+            digest = file_hash(path)
+            return digest, self.get(("file", digest), lambda: parse(None, path))
+        data = read_bytes(path)
+        digest = hashlib.sha256(data).hexdigest()
+        return digest, self.get(("file", digest), lambda: parse(data, path))
+
+
+def _parse_model(data, path):
+    if data is not None and path.endswith(".pkl"):
+        return pickle.loads(data)
+    return core.load_model(path)
+
+
+def _parse_csv(data, path):
+    return compact_table(pd.read_csv(io.BytesIO(data)))
+
+
+# ---------------------- Versions ----------------------
+class VersionStats:
+    """Request, cache-hit, model-latency and prediction-distribution counters of one version.
+
+    Latencies are those of the model itself, recorded on prediction cache
+    misses only; cache hits take well under a microsecond for any model and
+    would hide the difference between versions.
+    """
+
+    def __init__(self, n_diseases, window=10_000):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.model_calls = 0
+        self.total_seconds = 0.0
+        self.latencies = collections.deque(maxlen=window)
+        self.predictions = np.zeros(n_diseases, dtype=np.int64)
+
+    def record(self, disease_id):
+        with self._lock:
+            self.requests += 1
+            if 0 <= disease_id < len(self.predictions):
+                self.predictions[disease_id] += 1
+
+    def record_model(self, seconds):
+        with self._lock:
+            self.model_calls += 1
+            self.total_seconds += seconds
+            self.latencies.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self.latencies) * 1e6
+            predictions = self.predictions.copy()
+            requests, calls, total = self.requests, self.model_calls, self.total_seconds
+        return {
+            "requests": requests,
+            "model_calls": calls,
+            "cache_hit_rate": max(requests - calls, 0) / requests if requests else 0.0,
+            "mean_us": total / calls * 1e6 if calls else 0.0,
+            "p50_us": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p99_us": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            "predictions": {core.disease_name(i): int(n) for i, n in enumerate(predictions) if n},
+        }
+
+
+class ModelVersion:
+    """One model + catalog bundle with its own prediction/report caches and counters"""
+
+    def __init__(self, name, model, catalog, model_hash, table_hashes):
+        self.name = name
+        self.model = model
+        self.catalog = catalog
+        self.model_hash = model_hash
+        self.table_hashes = table_hashes
+        self.stats = VersionStats(catalog.n_diseases)
+        self.predict_key = lru_cache(maxsize=4096)(self._predict_key)
+        self.report = lru_cache(maxsize=256)(self._report)
+
+    def _predict_key(self, key):
+        # Runs on cache misses only, so the recorded latency is the model's
+        start = time.perf_counter()
+        disease_id = int(self.model.predict(core.decode_key(key))[0])
+        self.stats.record_model(time.perf_counter() - start)
+        return disease_id
+
+    def _report(self, disease_id):
+        return core.build_report(self.catalog, disease_id)
+
+    def recommend_key(self, key):
+        disease_id = self.predict_key(key)
+        report = self.report(disease_id)
+        self.stats.record(disease_id)
+        return report
+
+
+# ---------------------- Registry ----------------------
+class ModelRegistry:
+    """Versioned bundles plus tenant and experiment routing"""
+
+    def __init__(self, versions, default, tenants=None, experiments=None, content=None):
+        if default not in versions:
+            raise ValueError(f"Default version {default!r} is not registered")
+        self.versions = versions
+        self.default = default
+        self.tenants = dict(tenants or {})
+        self.experiments = {}
+        for experiment, arms in (experiments or {}).items():
+            total = float(sum(arms.values()))
+            if total <= 0:
+                raise ValueError(f"Experiment {experiment!r} has no traffic")
+            self.experiments[experiment] = [(version, weight / total) for version, weight in arms.items()]
+        unknown = (set(self.tenants.values()) | {v for arms in self.experiments.values() for v, _ in arms}) - set(versions)
+        if unknown:
+            raise ValueError(f"Routes point at unregistered versions {sorted(unknown)}")
+        self.content = content
+
+    def route(self, tenant=None, experiment=None, unit=""):
+        """Version name for a request: tenant mapping, then experiment arm, then default"""
+        if tenant in self.tenants:
+            return self.tenants[tenant]
+        arms = self.experiments.get(experiment)
+        if arms:
+            # Stable per unit, so a session keeps seeing the same arm
+            point = zlib.crc32(f"{experiment}:{unit}".encode()) / 2**32
+            cumulative = 0.0
+            for version, weight in arms:
+                cumulative += weight
+                if point < cumulative:
+                    return version
+            return arms[-1][0]
+        return self.default
+
+    def version(self, name=None):
+        return self.versions[name or self.default]
+
+    def recommend(self, symptoms, tenant=None, experiment=None, unit=""):
+        """``(version name, Report)`` for a collection of symptom names"""
+        name = self.route(tenant, experiment, unit)
+        return name, self.versions[name].recommend_key(core.encode_key(symptoms))
+
+    def stats(self):
+        return {name: version.stats.snapshot() for name, version in self.versions.items()}
+
+
+def load_registry(path):
+    """Build a ``ModelRegistry`` from a registry JSON file"""
+    with open(path) as file:
+        config = json.load(file)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    content = ContentStore()
+
+    def locate(name):
+        candidate = os.path.join(base_dir, name)
+        return candidate if os.path.exists(candidate) else core.resolve_path(name)
+
+    versions = {}
+    for name, spec in config["versions"].items():
+        model_hash, model = content.file(locate(spec.get("model", core.MODEL_FILE)), _parse_model)
+        overrides = spec.get("tables", {})
+        tables, table_hashes = {}, {}
+        for section in SECTIONS:
+            table_path = locate(overrides[section]) if section in overrides else core.resolve_path(TABLE_FILES[section])
+            table_hashes[section], tables[section] = content.file(table_path, _parse_csv)
+        catalog = content.get(
+            ("catalog",) + tuple(table_hashes[section] for section in SECTIONS),
+            lambda: build_catalog(diseases_list, *(tables[section] for section in SECTIONS), aliases=disease_aliases),
+        )
+        versions[name] = ModelVersion(name, model, catalog, model_hash, table_hashes)
+
+    return ModelRegistry(
+        versions,
+        config.get("default", next(iter(versions))),
+        config.get("tenants"),
+        config.get("experiments"),
+        content,
+    )
+
+
+def from_env():
+    """Registry configured by ``MEDIGUIDE_REGISTRY``, or None"""
+    path = os.environ.get("MEDIGUIDE_REGISTRY")
+    return load_registry(core.resolve_path(path)) if path else None
+
+
+def main(argv=None):
+    from mediguide.benchmark import training_symptom_sets
+
+    parser = argparse.ArgumentParser(description="Compare the versions of a model registry on Training.csv rows")
+    parser.add_argument("config")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--experiment", default=None, help="route through this experiment instead of every version")
+    args = parser.parse_args(argv)
+
+    registry = load_registry(args.config)
+    print(f"{len(registry.versions)} versions, {registry.content.loads} distinct objects loaded, "
+          f"{registry.content.shared} shared")
+    symptom_sets = training_symptom_sets(args.rows)
+    for unit, symptoms in enumerate(symptom_sets):
+        if args.experiment:
+            registry.recommend(symptoms, experiment=args.experiment, unit=str(unit))
+        else:
+            key = core.encode_key(symptoms)
+            for version in registry.versions.values():
+                version.recommend_key(key)
+
+    for name, stats in registry.stats().items():
+        version = registry.versions[name]
+        top = sorted(stats["predictions"].items(), key=lambda item: -item[1])[:3]
+        print(f"{name:12s} model {version.model_hash[:12]} requests {stats['requests']:6d} "
+              f"hits {stats['cache_hit_rate']:6.1%} model p50 {stats['p50_us']:8.1f}us "
+              f"p99 {stats['p99_us']:8.1f}us top {top}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Compact per-session prediction results with a server-wide eviction policy.
+
+A Streamlit server keeps one ``st.session_state`` per browser tab, and every
+widget interaction reruns the script. Keeping only a small slotted
+``SessionResult`` per session (symptom bitmask, disease id, model version
+and timestamps) lets a rerun reuse the previous prediction instead of
+recomputing it. Reports are rendered from the disease id through a
+per-disease cache, so no session holds its own copy, and the ``ResultStore``
+bounds the total memory held for idle sessions with an LRU limit and an idle
+timeout.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+# ---------------------- Symptom Keys ----------------------
+def symptom_key(indices):
+    """Bit-pack symptom indices into a single int (bit i set = symptom i present)"""
+    key = 0
+    for index in indices:
+        key |= 1 << index
+    return key
+
+
+def symptom_indices(key):
+    """Inverse of ``symptom_key``: sorted list of set bit positions"""
+    indices = []
+    index = 0
+    while key:
+        if key & 1:
+            indices.append(index)
+        key >>= 1
+        index += 1
+    return indices
+
+
+# ---------------------- Results ----------------------
+class SessionResult:
+    """Prediction outcome of one session, small enough to keep for every idle tab"""
+
+    __slots__ = ("symptom_key", "disease_id", "version", "created", "accessed")
+
+    def __init__(self, symptom_key, disease_id, created=None, version=None):
+        self.symptom_key = symptom_key
+        self.disease_id = disease_id
+        # Registry version that produced the result, None for the default core model
+        self.version = version
+        self.created = time.time() if created is None else created
+        self.accessed = time.monotonic()
+
+    @property
+    def symptoms(self):
+        return symptom_indices(self.symptom_key)
+
+    def __repr__(self):
+        return f"SessionResult(disease_id={self.disease_id}, symptoms={self.symptoms})"
+
+
+class ResultStore:
+    """Thread-safe LRU store of ``SessionResult`` objects keyed by session id.
+
+    Entries idle for longer than ``ttl`` seconds are dropped lazily, and the
+    least recently used entries are evicted once ``max_sessions`` is reached.
+    """
+
+    def __init__(self, max_sessions=10_000, ttl=3600.0, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._clock = clock
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, session_id):
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            result = self._results.get(session_id)
+            if result is not None:
+                result.accessed = now
+                self._results.move_to_end(session_id)
+            return result
+
+    def put(self, session_id, result):
+        now = self._clock()
+        with self._lock:
+            result.accessed = now
+            self._results[session_id] = result
+            self._results.move_to_end(session_id)
+            self._expire(now)
+            while len(self._results) > self.max_sessions:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, session_id):
+        with self._lock:
+            self._results.pop(session_id, None)
+
+    def _expire(self, now):
+        # Entries are ordered by last access, so stale ones are always at the front
+        while self._results:
+            session_id, result = next(iter(self._results.items()))
+            if now - result.accessed <= self.ttl:
+                break
+            del self._results[session_id]
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, session_id):
+        return session_id in self._results
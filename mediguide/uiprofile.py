@@ -0,0 +1,135 @@
+"""Rerun counters for the Streamlit front-ends and an interaction benchmark.
+
+The front-ends split their UI into ``st.fragment`` sections (picker, report,
+footer) wrapped in ``profiled(name)``, which counts how often each section
+runs and how much server time it takes. Under ``streamlit run`` a widget
+inside a fragment reruns only that fragment. Streamlit's ``AppTest`` runner
+always executes the whole script, so the benchmark below drives the scripted
+interactions through ``AppTest`` and reports, per interaction, the
+whole-script time (what every interaction cost before fragments) next to the
+time of the sections the interaction actually reruns under the server.
+
+Usage::
+
+    python -m mediguide.uiprofile [--app app.py] [--repeat 5]
+"""
+import argparse
+import functools
+import os
+import sys
+import threading
+import time
+
+
+class RerunProfiler:
+    """Per-section run counts and server seconds, shared by all sessions of a process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = {}
+        self.seconds = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.runs[name] = self.runs.get(name, 0) + 1
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {name: (self.runs[name], self.seconds[name]) for name in self.runs}
+
+    def reset(self):
+        with self._lock:
+            self.runs.clear()
+            self.seconds.clear()
+
+
+PROFILER = RerunProfiler()
+
+
+def profiled(name):
+    """Decorator recording every run of a UI section in ``PROFILER``"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+# ---------------------- Benchmark ----------------------
+# (label, action, sections rerun under the server; None = whole script)
+APP_INTERACTIONS = (
+    ("initial load", lambda at: None, None),
+    ("pick 1st symptom", lambda at: at.multiselect(key="symptom_selector").set_value(["itching"]), ("picker",)),
+    ("pick 2nd symptom", lambda at: at.multiselect(key="symptom_selector").set_value(["itching", "skin_rash"]), ("picker",)),
+    ("analyze", lambda at: at.button(key="analyze").click(), None),
+    ("pick 3rd symptom", lambda at: at.multiselect(key="symptom_selector").set_value(
+        ["itching", "skin_rash", "nodal_skin_eruptions"]), ("picker",)),
+    ("start new diagnosis", lambda at: at.button[-1].click(), None),
+)
+
+INDEX_INTERACTIONS = (
+    ("initial load", lambda at: None, None),
+    ("pick 1st symptom", lambda at: at.multiselect(key="all_symptoms").set_value(["itching"]), ("picker",)),
+    ("pick category symptom", lambda at: at.multiselect(key="cat_4").set_value(["skin_rash"]), ("picker",)),
+    ("analyze", lambda at: at.button[0].click(), ("report",)),
+    # Changing the selection under a report reruns the whole script once to clear it
+    ("pick 2nd symptom", lambda at: at.multiselect(key="all_symptoms").set_value(["itching", "chills"]), None),
+    ("pick 3rd symptom", lambda at: at.multiselect(key="all_symptoms").set_value(
+        ["itching", "chills", "vomiting"]), ("picker",)),
+)
+
+
+def measure(app_path, interactions, repeat=5):
+    """Best-of-``repeat`` timings ``(label, script_ms, fragment_ms, sections rerun)`` per interaction"""
+    from streamlit.testing.v1 import AppTest
+
+    # The app records into the imported module's profiler, not ``__main__``'s under ``python -m``
+    from mediguide.uiprofile import PROFILER
+
+    best = {}
+    for _ in range(repeat):
+        at = AppTest.from_file(app_path, default_timeout=60)
+        for label, action, sections in interactions:
+            action(at)
+            PROFILER.reset()
+            start = time.perf_counter()
+            at.run()
+            script = time.perf_counter() - start
+            if at.exception:
+                raise RuntimeError(f"{label}: {at.exception[0].message}")
+            runs = PROFILER.snapshot()
+            if sections is None:
+                fragment, rerun = script, "whole script"
+            else:
+                fragment = sum(runs.get(name, (0, 0.0))[1] for name in sections)
+                rerun = "+".join(sections)
+            previous = best.get(label)
+            if previous is None or script < previous[0]:
+                best[label] = (script, fragment, rerun)
+    return [(label,) + best[label] for label, _, _ in interactions]
+
+
+def main(argv=None):
+    from mediguide import core
+
+    parser = argparse.ArgumentParser(description="Server time per UI interaction, whole script vs fragment")
+    parser.add_argument("--app", choices=("app.py", "index.py"), default="app.py")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    interactions = APP_INTERACTIONS if args.app == "app.py" else INDEX_INTERACTIONS
+    rows = measure(os.path.join(core.DATA_DIR, args.app), interactions, args.repeat)
+    print(f"{'interaction':24s} {'script ms':>10s} {'fragment ms':>12s}  reruns")
+    for label, script, fragment, rerun in rows:
+        print(f"{label:24s} {script * 1e3:10.2f} {fragment * 1e3:12.2f}  {rerun}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
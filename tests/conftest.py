@@ -0,0 +1,23 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mediguide import core  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def svc():
+    with open(core.resolve_path("svc.pkl"), "rb") as file:
+        return pickle.load(file)
+
+
+@pytest.fixture(scope="session")
+def training_features():
+    data = pd.read_csv(core.resolve_path("Training.csv"))
+    return data.drop(columns=["prognosis"]).to_numpy(dtype=np.float64)
@@ -0,0 +1,73 @@
+import time
+
+from mediguide import audit
+from mediguide.audit import RECORD, AuditLog, read_records, symptom_keys, version_names
+
+
+def test_records_round_trip(tmp_path):
+    entries = [(1 << 131 | 1, 3, "svc.pkl@abc"), (1 << 5, 40, None), (1 << 64, 7, audit.QUESTIONNAIRE_SOURCE)]
+    with AuditLog(str(tmp_path), default_version="default") as log:
+        for timestamp, (key, disease_id, version) in enumerate(entries, 1):
+            log.record(key, disease_id, version, timestamp=timestamp)
+
+    records = next(read_records(str(tmp_path)))
+    names = version_names(str(tmp_path))
+    assert symptom_keys(records) == [key for key, _, _ in entries]
+    assert records["disease"].tolist() == [disease_id for _, disease_id, _ in entries]
+    assert records["timestamp"].tolist() == [1, 2, 3]
+    assert [names[v] for v in records["version"].tolist()] == ["svc.pkl@abc", "default", "questionnaire"]
+
+
+def test_segments_rotate_on_whole_records(tmp_path):
+    with AuditLog(str(tmp_path), max_bytes=RECORD.size * 10) as log:
+        for i in range(25):
+            log.record(1 << i, i)
+
+    assert len(audit.segments(str(tmp_path))) >= 3
+    keys = [key for records in read_records(str(tmp_path)) for key in symptom_keys(records)]
+    assert keys == [1 << i for i in range(25)]
+
+
+def test_version_ids_are_shared_between_writers(tmp_path):
+    with AuditLog(str(tmp_path)) as first:
+        first.record(1, 0, "v1")
+    with AuditLog(str(tmp_path)) as second:
+        second.record(1, 0, "v2")
+        second.record(1, 0, "v1")
+
+    names = version_names(str(tmp_path))
+    assert sorted(names.values()) == ["v1", "v2"]
+    versions = [v for records in read_records(str(tmp_path)) for v in records["version"].tolist()]
+    assert [names[v] for v in versions] == ["v1", "v2", "v1"]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_writer_survives_failures_and_retries(tmp_path):
+    versions = tmp_path / "versions.json"
+    versions.write_text("{corrupt")
+    with AuditLog(str(tmp_path), flush_interval=0.01) as log:
+        log.record(1, 0, "v1")
+        assert wait_for(lambda: log.error is not None)
+        assert log._thread.is_alive() and log.written == 0
+
+        versions.unlink()
+        log.record(2, 1, "v1")
+        assert wait_for(lambda: log.written == 2)
+        assert log.error is None
+
+    assert [key for records in read_records(str(tmp_path)) for key in symptom_keys(records)] == [1, 2]
+
+
+def test_queue_is_bounded_while_writes_fail(tmp_path):
+    (tmp_path / "versions.json").write_text("{corrupt")
+    with AuditLog(str(tmp_path), flush_interval=0.01, max_queued=10) as log:
+        for i in range(25):
+            log.record(1 << i, i, "v1")
+        assert len(log._queue) <= 10
+        assert log.dropped >= 15 and log.error is not None
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from mediguide import core
+from mediguide.catalog import CatalogError, join_table, join_tables, load_catalog
+from mediguide.vocabulary import disease_aliases, diseases_list
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog(diseases_list, core.DATA_DIR, aliases=disease_aliases)
+
+
+def test_every_label_joins_to_every_table(catalog):
+    assert catalog.n_diseases == max(diseases_list) + 1
+    for disease_id in diseases_list:
+        assert catalog.description(disease_id) != "No description available."
+        for section in ("precautions", "medications", "diets", "workouts"):
+            assert catalog.items(section, disease_id), (section, diseases_list[disease_id])
+
+
+def test_join_table_reports_missing_and_unknown_names():
+    diseases = {0: "Acne", 1: "Malaria"}
+    rows, missing, unknown = join_table(diseases, ["Acne", " Acne ", "Flu", float("nan")])
+    assert list(rows[0]) == [0, 1]
+    assert missing == ["Malaria"]
+    assert unknown == ["Flu"]
+
+
+def test_join_table_applies_aliases():
+    rows, missing, unknown = join_table({0: "Peptic ulcer disease"}, ["Peptic ulcer diseae"],
+                                        aliases={"Peptic ulcer diseae": "Peptic ulcer disease"})
+    assert list(rows[0]) == [0] and not missing and not unknown
+
+
+def test_join_tables_raises_on_mismatch():
+    with pytest.raises(CatalogError, match="unknown diseases"):
+        join_tables({0: "Acne"}, {"description": pd.DataFrame({"Disease": ["Acne", "Flu"]})})
@@ -0,0 +1,49 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mediguide import core
+from mediguide.cooccurrence import SymptomCooccurrence, build_cooccurrence
+from mediguide.vocabulary import symptom_names, symptoms_dict
+
+
+@pytest.fixture(scope="module")
+def cooccurrence():
+    return build_cooccurrence(pd.read_csv(core.resolve_path("Training.csv")))
+
+
+def suggest(cooccurrence, *names, n=4):
+    return [symptom_names[i] for i in cooccurrence.suggest([symptoms_dict[name] for name in names], n)]
+
+
+def test_itching_suggests_the_fungal_infection_profile(cooccurrence):
+    suggestions = suggest(cooccurrence, "itching")
+    assert suggestions[:2] == ["skin_rash", "nodal_skin_eruptions"]
+    assert "fatigue" not in suggestions
+
+
+def test_suggestions_exclude_the_selection_and_unseen_symptoms(cooccurrence):
+    suggestions = suggest(cooccurrence, "itching", "skin_rash", n=len(symptoms_dict))
+    assert not {"itching", "skin_rash"} & set(suggestions)
+    seen = cooccurrence.pairs[[symptoms_dict["itching"], symptoms_dict["skin_rash"]]].any(axis=0)
+    assert len(suggestions) == seen.sum() - 2
+
+
+def test_update_and_reload_keep_suggestions(cooccurrence):
+    empty = SymptomCooccurrence.empty(cooccurrence.n_symptoms, len(cooccurrence.class_counts))
+    training = pd.read_csv(core.resolve_path("Training.csv"))
+    features = training.drop(columns=["prognosis"]).to_numpy()
+    labels = pd.factorize(training["prognosis"], sort=True)[0]
+    # Folding the cases in two batches gives the same counts as building at once
+    empty.update(features[::2], labels[::2])
+    empty.update(features[1::2], labels[1::2])
+    np.testing.assert_array_equal(empty.pairs, cooccurrence.pairs)
+    np.testing.assert_array_equal(empty.profiles, cooccurrence.profiles)
+
+    buffer = io.BytesIO()
+    cooccurrence.save(buffer)
+    buffer.seek(0)
+    loaded = SymptomCooccurrence.load(buffer)
+    assert suggest(loaded, "cough", "high_fever") == suggest(cooccurrence, "cough", "high_fever")
@@ -0,0 +1,13 @@
+import numpy as np
+
+from mediguide.distill import DistilledModel, distill
+
+
+def test_distilled_model_keeps_its_threshold(svc, training_features, tmp_path):
+    tree = distill(svc, training_features, removals=1)
+    path = tmp_path / "svc_tree.npz"
+    DistilledModel(tree, svc, min_confidence=0.9).save(path)
+
+    loaded = DistilledModel.load(path, svc)
+    assert loaded.min_confidence == 0.9
+    np.testing.assert_array_equal(loaded.predict(training_features), svc.predict(training_features))
@@ -0,0 +1,41 @@
+import numpy as np
+
+from mediguide.ensemble import Ensemble, EnsembleMember, vote_weight
+
+
+class ConstantModel:
+    classes_ = np.arange(3)
+
+    def __init__(self, label):
+        self.label = label
+
+    def predict(self, X):
+        return np.full(len(X), self.label)
+
+
+def ensemble(*members):
+    return Ensemble([EnsembleMember(name, ConstantModel(label), weight, budget_ms=5_000)
+                     for name, label, weight in members])
+
+
+def test_ties_go_to_the_highest_weight_member():
+    X = np.zeros((4, 2))
+    vote = ensemble(("svc", 2, 1.0), ("random_forest", 1, 1.0), ("naive_bayes", 0, 2.0), ("knn", 1, 1.0))
+    try:
+        # 0 and 1 both have 2.0: naive_bayes outweighs the others, not the lowest class id
+        assert list(vote.predict(X)) == [0] * 4
+    finally:
+        vote.shutdown()
+
+    vote = ensemble(("svc", 2, 1.0), ("knn", 1, 1.0))
+    try:
+        # Equal weights: manifest order, so the SVC listed first
+        assert list(vote.predict(X)) == [2] * 4
+    finally:
+        vote.shutdown()
+
+
+def test_vote_weight_grows_with_accuracy_and_stays_finite():
+    weights = [vote_weight(correct, 100, 41) for correct in (50, 75, 100)]
+    assert weights == sorted(weights)
+    assert np.isfinite(weights[-1])
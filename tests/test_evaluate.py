@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mediguide import core
+from mediguide.evaluate import load_labeled, training_classes
+
+
+@pytest.fixture(scope="module")
+def classes():
+    return training_classes(core.resolve_path("Training.csv"))
+
+
+@pytest.fixture(scope="module")
+def sample():
+    return pd.read_csv(core.resolve_path("Training.csv")).sample(200, random_state=0)
+
+
+def test_columns_are_matched_by_name(sample, classes, tmp_path):
+    shuffled = tmp_path / "shuffled.csv"
+    columns = list(sample.columns)
+    sample[columns[::-1]].to_csv(shuffled, index=False)
+    ordered = tmp_path / "ordered.csv"
+    sample.to_csv(ordered, index=False)
+
+    X, y = load_labeled(ordered, classes)
+    X_shuffled, y_shuffled = load_labeled(shuffled, classes)
+    np.testing.assert_array_equal(X_shuffled, X)
+    np.testing.assert_array_equal(y_shuffled, y)
+
+
+def test_missing_or_extra_columns_are_rejected(sample, classes, tmp_path):
+    path = tmp_path / "broken.csv"
+    sample.drop(columns=["itching"]).assign(new_symptom=0).to_csv(path, index=False)
+    with pytest.raises(ValueError, match=r"missing \['itching'\], unexpected \['new_symptom'\]"):
+        load_labeled(path, classes)
@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from mediguide.loader import AssetLoader
+
+
+def test_derived_asset_is_built_once_under_concurrent_requests(tmp_path):
+    source = tmp_path / "table.txt"
+    source.write_text("rows")
+    builds = []
+    loader = AssetLoader({"table": (str(source), lambda data, path: data.decode())})
+
+    def build(table):
+        builds.append(table)
+        return table.upper()
+
+    results, errors = [], []
+
+    def request():
+        try:
+            results.append(loader.derive("catalog", build, ["table"]))
+        except Exception as error:  # pragma: no cover - reported below
+            errors.append(error)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert results == ["ROWS"] * 8
+    assert builds == ["rows"]
+    assert loader.pending() == [] and loader.errors() == {}
+    with pytest.raises(KeyError):
+        loader.result("table")  # the source was dropped once the derived asset existed
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from mediguide import core, memory
+from mediguide.catalog import compact_table
+
+
+def test_loaded_assets_fit_the_replica_budget():
+    core.start_loading().wait()
+    assert sum(memory.asset_sizes().values()) <= memory.MAX_ASSETS_MB * 2**20
+
+
+def test_compact_table_drops_exported_index_columns():
+    raw = pd.read_csv(core.resolve_path("workout_df.csv"))
+    assert any(column.startswith("Unnamed:") for column in raw.columns)
+
+    compact = compact_table(raw)
+    assert not any(column.startswith("Unnamed:") for column in compact.columns)
+    assert list(compact.columns) == ["Disease", "workout"]
+    assert memory.deep_sizeof(compact) < memory.deep_sizeof(raw)
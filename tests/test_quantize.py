@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from mediguide.quantize import QuantizedSVC, quantize, verify
+
+
+@pytest.mark.parametrize("bits", [8, 16])
+def test_quantized_model_reproduces_training_predictions(svc, training_features, bits):
+    quantized = quantize(svc, bits)
+    assert quantized.bits == bits
+    assert len(verify(quantized, svc, training_features)) == 0
+
+
+def test_quantized_model_round_trips_through_npz(svc, training_features, tmp_path):
+    quantized = quantize(svc, 8)
+    path = tmp_path / "svc_int8.npz"
+    quantized.save(path)
+    loaded = QuantizedSVC.load(path)
+    assert loaded.weights.dtype == np.int8
+    np.testing.assert_array_equal(loaded.predict(training_features), quantized.predict(training_features))
+
+
+def test_quantize_rejects_unsupported_bit_width(svc):
+    with pytest.raises(ValueError):
+        quantize(svc, 4)
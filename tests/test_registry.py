@@ -0,0 +1,26 @@
+from mediguide import core
+from mediguide.registry import ModelVersion
+
+
+class CountingModel:
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return self.model.predict(X)
+
+
+def test_version_latency_times_the_model_not_the_cache(svc):
+    model = CountingModel(svc)
+    version = ModelVersion("v1", model, core.get_catalog(), "hash", {})
+    keys = [core.encode_key(["itching"]), core.encode_key(["chills", "vomiting"])]
+    for key in keys * 5:
+        version.recommend_key(key)
+
+    stats = version.stats.snapshot()
+    assert model.calls == stats["model_calls"] == 2
+    assert stats["requests"] == 10 and stats["cache_hit_rate"] == 0.8
+    assert len(version.stats.latencies) == 2
+    assert sum(stats["predictions"].values()) == 10
@@ -0,0 +1,40 @@
+from mediguide.session_store import (
+    ResultStore,
+    SessionResult,
+    symptom_indices,
+    symptom_key,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_symptom_key_round_trip():
+    assert symptom_indices(symptom_key([131, 0, 7])) == [0, 7, 131]
+
+
+def test_least_recently_used_session_is_evicted():
+    store = ResultStore(max_sessions=2, clock=FakeClock())
+    store.put("a", SessionResult(1, 0))
+    store.put("b", SessionResult(2, 1))
+    assert store.get("a") is not None  # "b" is now the least recently used
+    store.put("c", SessionResult(4, 2))
+    assert "a" in store and "c" in store and "b" not in store
+    assert len(store) == 2 and store.evictions == 1
+
+
+def test_idle_sessions_expire_after_ttl():
+    clock = FakeClock()
+    store = ResultStore(ttl=10.0, clock=clock)
+    store.put("a", SessionResult(1, 0))
+    clock.now = 5.0
+    store.put("b", SessionResult(2, 1))
+    clock.now = 12.0
+    assert store.get("a") is None
+    assert store.get("b").disease_id == 1
+    assert store.evictions == 1
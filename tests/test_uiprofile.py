@@ -0,0 +1,44 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from mediguide.uiprofile import PROFILER, profiled
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def test_profiled_counts_runs_and_failures():
+    calls = []
+
+    @profiled("section")
+    def section(fail=False):
+        calls.append(fail)
+        if fail:
+            raise RuntimeError("boom")
+
+    PROFILER.reset()
+    section()
+    try:
+        section(fail=True)
+    except RuntimeError:
+        pass
+    runs, seconds = PROFILER.snapshot()["section"]
+    assert (runs, len(calls)) == (2, 2)
+    assert seconds >= 0
+    PROFILER.reset()
+    assert PROFILER.snapshot() == {}
+
+
+def test_app_sections_are_recorded_per_run():
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    assert not at.exception
+    PROFILER.reset()
+    at.multiselect(key="symptom_selector").set_value(["itching"]).run()
+    assert not at.exception
+    snapshot = PROFILER.snapshot()
+    # AppTest reruns the whole script, so every section ran exactly once
+    assert {"picker", "footer"} <= set(snapshot)
+    for name, (runs, seconds) in snapshot.items():
+        assert runs == 1, name
+        assert seconds > 0, name
+